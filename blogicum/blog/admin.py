@@ -1,21 +1,59 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db.models import Q
 from django.utils.safestring import mark_safe
 
+from blog.constants import ADMIN_SEARCH_RESULT_LIMIT
+from blog.images import get_variant_url
 from blog.models import Category, Location, Post, Comment
+from blog.paginators import EstimatedCountPaginator
+from blog.search import WORD, has_search_index, search_index_ids
 
 
 admin.site.unregister(Group)
 admin.site.empty_value_display = 'Не задано'
 
 
+class FullTextSearchMixin:
+    """Mixin. Search the full-text index of the table instead of LIKE.
+
+    Matches are capped at the ``ADMIN_SEARCH_RESULT_LIMIT`` best ranked
+    ones, a word equal to the author's username finds the author's rows.
+    Counts are estimated, so large tables are never scanned.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        words = WORD.findall(search_term)
+        if not words or not has_search_index(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        # Authors are looked up first: an OR across the join to the user
+        # table would make the database scan the searched one.
+        author_ids = list(
+            get_user_model().objects
+            .filter(username__in=words)
+            .values_list('pk', flat=True)
+        )
+        return queryset.filter(
+            Q(pk__in=search_index_ids(
+                queryset.model._meta.db_table,
+                search_term,
+                ADMIN_SEARCH_RESULT_LIMIT,
+            ))
+            | Q(author_id__in=author_ids)
+        ), False
+
+
 class CommentInline(admin.TabularInline):
     model = Comment
     extra = 0
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'text',
@@ -32,7 +70,8 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'category',
     )
-    search_fields = ('title',)
+    list_select_related = ('author', 'location', 'category')
+    search_fields = ('title', 'text', '=author__username')
     list_filter = (
         'category',
         'location',
@@ -43,7 +82,10 @@ class PostAdmin(admin.ModelAdmin):
     @admin.display(description="Изображение")
     def post_image(self, obj):
         return (
-            mark_safe(f'<img src={obj.image.url} width="80" height="60">')
+            mark_safe(
+                f'<img src={get_variant_url(obj.image, "admin")} '
+                'width="80" height="60">'
+            )
             if obj.image
             else 'без изображения'
         )
@@ -88,11 +130,12 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'text',
         'created_at',
         'author',
     )
-    search_fields = ('text',)
+    list_select_related = ('author',)
+    search_fields = ('text', '=author__username')
     date_hierarchy = 'created_at'
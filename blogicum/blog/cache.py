@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from hashlib import md5
+from math import ceil
+from time import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.utils.timezone import now
+
+from .models import Category, Post
+
+GLOBAL_TAG = 'blog'
+INDEX_TAG = 'index'
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def profile_tag(username):
+    return f'profile:{username}'
+
+
+def _tag_keys(tags):
+    return [f'blog:tag:{md5(tag.encode()).hexdigest()}' for tag in tags]
+
+
+def _get_tag_timestamps(tags):
+    """Return the time each tag was last invalidated."""
+    keys = _tag_keys(tags)
+    timestamps = cache.get_many(keys)
+    missing = {key: time() for key in keys if key not in timestamps}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        timestamps.update(missing)
+    return [timestamps[key] for key in keys]
+
+
+def get_tags_version(tags):
+    """Return a version string that changes whenever any tag is invalidated."""
+    return '.'.join(repr(stamp) for stamp in _get_tag_timestamps(tags))
+
+
+def get_tags_last_modified(tags):
+    return datetime.fromtimestamp(
+        max(_get_tag_timestamps(tags)), tz=timezone.utc
+    )
+
+
+def invalidate_tags(*tags):
+    timestamp = time()
+    cache.set_many(
+        {key: timestamp for key in _tag_keys(tags)}, timeout=None
+    )
+
+
+def invalidate_post_pages(category_ids, author_ids):
+    """Drop cached list pages that may show posts of these owners."""
+    slugs = Category.objects.filter(
+        pk__in=category_ids
+    ).values_list('slug', flat=True)
+    usernames = get_user_model().objects.filter(
+        pk__in=author_ids
+    ).values_list('username', flat=True)
+    invalidate_tags(
+        INDEX_TAG,
+        *(category_tag(slug) for slug in slugs),
+        *(profile_tag(username) for username in usernames),
+    )
+
+
+def get_posts_last_modified(queryset, tags, timeout, variant=''):
+    """Return when a list of posts could have changed last.
+
+    Edits are tracked by the tags. Publication of scheduled posts is caught
+    by the latest visible ``pub_date``, read with one indexed query and
+    cached until the tags change or the next scheduled post appears.
+    ``variant`` tells apart visitors that see different posts.
+    """
+    version = get_tags_version(tags)
+    last_modified = get_tags_last_modified(tags)
+    key = 'blog:last_published:' + md5(
+        f'{tags}|{version}|{variant}'.encode()
+    ).hexdigest()
+    last_published = cache.get(key)
+    if last_published is None:
+        last_published = queryset.filter(
+            pub_date__lte=now()
+        ).aggregate(pub_date=Max('pub_date'))['pub_date'] or ''
+        cache.set(key, last_published, get_cache_timeout(timeout))
+    if not last_published:
+        return last_modified
+    return max(last_modified, last_published)
+
+
+def get_page_cache_key(request, tags):
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{path}:{get_tags_version(tags)}'
+
+
+def get_next_publication():
+    """Return when the nearest scheduled post becomes visible, or None."""
+    next_publication = cache.get(NEXT_PUBLICATION_KEY)
+    if next_publication is not None:
+        return next_publication or None
+
+    current_time = now()
+    next_publication = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=current_time,
+    ).aggregate(pub_date=Min('pub_date'))['pub_date']
+    if next_publication is None:
+        cache.set(NEXT_PUBLICATION_KEY, '', timeout=None)
+    else:
+        cache.set(
+            NEXT_PUBLICATION_KEY,
+            next_publication,
+            timeout=get_seconds_until(next_publication, current_time),
+        )
+    return next_publication
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def get_seconds_until(moment, current_time=None):
+    seconds = (moment - (current_time or now())).total_seconds()
+    return max(ceil(seconds), 1)
+
+
+def get_cache_timeout(timeout):
+    """Cut the timeout so entries expire when a scheduled post appears."""
+    next_publication = get_next_publication()
+    if next_publication is None:
+        return timeout
+    return min(timeout, get_seconds_until(next_publication))
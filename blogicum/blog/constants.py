@@ -1,3 +1,40 @@
 CHARFIELDS_MAX_LENGTH = 256
 MAX_CHAR_LENGTH_TO_STR = 20
 MAX_OBJECT_COUNT_ON_PAGE = 10
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Cards are keyed by the post version, so they may live long.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+IMAGE_VARIANTS_DIR = 'variants'
+IMAGE_VARIANTS = {
+    'card': (640, 640),
+    'detail': (1280, 1280),
+    'admin': (80, 60),
+}
+IMAGE_VARIANTS_WORKERS = 2
+IMAGE_VARIANTS_QUEUE_SIZE = 20
+IMAGE_RESPONSIVE_WIDTHS = (320, 640, 960, 1280)
+# Listed in order of preference, the ones Pillow can't write are skipped.
+IMAGE_MODERN_FORMATS = {'AVIF': 'image/avif', 'WEBP': 'image/webp'}
+IMAGE_PICTURE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 30 * 1000 * 1000
+# Room for the other form fields and the multipart boundaries.
+UPLOAD_MAX_REQUEST_SIZE = IMAGE_MAX_UPLOAD_SIZE + 1024 * 1024
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_SNIPPET_TOKENS = 32
+# Search results are ranked afresh for every page, so only the best ones.
+SEARCH_RESULT_LIMIT = 100
+ADMIN_SEARCH_RESULT_LIMIT = 1000
+ADMIN_COUNT_LIMIT = 10000
+RELATED_POSTS_COUNT = 5
+# More neighbours are stored than shown to replace the hidden ones.
+RELATED_POSTS_STORED = 10
+RELATED_POSTS_DIMENSIONS = 2 ** 10
+RELATED_POSTS_BATCH_SIZE = 500
+# Posts a batch is compared with at once, as dense vectors.
+RELATED_POSTS_CHUNK_SIZE = 20000
+RELATED_TITLE_WEIGHT = 2.0
+RELATED_CATEGORY_BONUS = 0.2
+RELATED_LOCATION_BONUS = 0.1
+FEED_ITEM_COUNT = 20
+SITEMAP_SHARD_SIZE = 50000
@@ -0,0 +1,119 @@
+"""Synthetic blog content for benchmarks.
+
+Rows follow the shapes of the bundled fixture and of the test fixtures:
+most posts are published in published categories with a location, some
+are hidden, scheduled for the future or sit in a hidden category.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .cache import GLOBAL_TAG, forget_next_publication, invalidate_tags
+from .models import Category, Comment, Location, Post
+
+WORDS = (
+    'обед', 'вечер', 'гости', 'письмо', 'дорога', 'город', 'поезд', 'театр',
+    'музыка', 'концерт', 'друзья', 'работа', 'книга', 'утро', 'прогулка',
+    'погода', 'река', 'сад', 'весна', 'зима', 'разговор', 'дом', 'море',
+    'встреча', 'новости', 'праздник', 'история', 'картина', 'лес', 'ночь',
+)
+UNPUBLISHED_SHARE = 0.05
+FUTURE_SHARE = 0.05
+HIDDEN_CATEGORY_SHARE = 0.1
+WITHOUT_LOCATION_SHARE = 0.2
+
+
+def make_text(rng, words_count):
+    return ' '.join(rng.choices(WORDS, k=words_count)).capitalize() + '.'
+
+
+def bulk_create_in_batches(model, objects, batch_size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed(
+    users=100, categories=20, locations=50, posts=10000, comments=50000,
+    batch_size=1000, random_seed=0,
+):
+    """Bulk insert synthetic rows and repair the data derived from them."""
+    rng = random.Random(random_seed)
+    current_time = now()
+    User = get_user_model()
+    prefix = f'bench{current_time:%Y%m%d%H%M%S}'
+    password = make_password(None)
+
+    bulk_create_in_batches(User, (
+        User(username=f'{prefix}_{number}', password=password)
+        for number in range(users)
+    ), batch_size)
+    bulk_create_in_batches(Category, (
+        Category(
+            title=make_text(rng, 2),
+            description=make_text(rng, 12),
+            slug=f'{prefix}-{number}',
+            is_published=rng.random() >= HIDDEN_CATEGORY_SHARE,
+        )
+        for number in range(categories)
+    ), batch_size)
+    bulk_create_in_batches(Location, (
+        Location(name=make_text(rng, 1)) for _ in range(locations)
+    ), batch_size)
+
+    user_ids = list(User.objects.filter(
+        username__startswith=f'{prefix}_'
+    ).values_list('id', flat=True))
+    category_ids = list(Category.objects.filter(
+        slug__startswith=f'{prefix}-'
+    ).values_list('id', flat=True))
+    location_ids = list(Location.objects.values_list('id', flat=True))
+
+    def make_post():
+        shift = timedelta(minutes=rng.randrange(60 * 24 * 365 * 5))
+        return Post(
+            title=make_text(rng, rng.randint(1, 6)),
+            text=make_text(rng, rng.randint(20, 200)),
+            pub_date=(
+                current_time + shift
+                if rng.random() < FUTURE_SHARE
+                else current_time - shift
+            ),
+            is_published=rng.random() >= UNPUBLISHED_SHARE,
+            author_id=rng.choice(user_ids),
+            category_id=rng.choice(category_ids),
+            location_id=(
+                None
+                if rng.random() < WITHOUT_LOCATION_SHARE
+                else rng.choice(location_ids)
+            ),
+        )
+
+    last_post_id = Post.objects.aggregate(id=Max('id'))['id'] or 0
+    bulk_create_in_batches(
+        Post, (make_post() for _ in range(posts)), batch_size
+    )
+    post_ids = list(Post.objects.filter(
+        id__gt=last_post_id
+    ).values_list('id', flat=True))
+    bulk_create_in_batches(Comment, (
+        Comment(
+            text=make_text(rng, rng.randint(3, 40)),
+            post_id=rng.choice(post_ids),
+            author_id=rng.choice(user_ids),
+        )
+        for _ in range(comments)
+    ), batch_size)
+
+    Post.objects.recount_comments()
+    forget_next_publication()
+    invalidate_tags(GLOBAL_TAG)
@@ -0,0 +1,195 @@
+"""RSS and Atom feeds of the published posts.
+
+Readers poll feeds often, so the generated XML is cached under the same
+tags as the list pages and answered with 304 Not Modified while nothing
+has changed. A poll then costs a few cache lookups and no queries.
+"""
+from calendar import timegm
+from hashlib import md5
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from .cache import (
+    GLOBAL_TAG, INDEX_TAG, category_tag, get_cache_timeout,
+    get_page_cache_key, get_posts_last_modified, get_tags_version,
+    profile_tag
+)
+from .constants import FEED_ITEM_COUNT, PAGE_CACHE_TIMEOUT
+from .models import Category, Post
+
+
+class CachedFeedMixin:
+    """Serve the feed from the cache and answer conditional requests.
+
+    The feed doesn't depend on the visitor, so unlike the pages it's
+    cached for everyone.
+    """
+
+    def get_cache_tags(self, **kwargs):
+        raise NotImplementedError(
+            'Define get_cache_tags() in CachedFeedMixin subclass'
+        )
+
+    def get_freshness_queryset(self, **kwargs):
+        """Return posts whose publication changes the feed."""
+        raise NotImplementedError(
+            'Define get_freshness_queryset() in CachedFeedMixin subclass'
+        )
+
+    def __call__(self, request, *args, **kwargs):
+        tags = self.get_cache_tags(**kwargs)
+        last_modified = get_posts_last_modified(
+            self.get_freshness_queryset(**kwargs), tags, PAGE_CACHE_TIMEOUT
+        )
+        timestamp = timegm(last_modified.utctimetuple())
+        etag = quote_etag(md5(
+            f'{request.path}|{timestamp}|{get_tags_version(tags)}'.encode()
+        ).hexdigest())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            key = get_page_cache_key(request, tags)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = super().__call__(request, *args, **kwargs)
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    get_cache_timeout(PAGE_CACHE_TIMEOUT),
+                )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class PostFeed(CachedFeedMixin, Feed):
+    """Feed of the latest published posts."""
+
+    title = 'Блогикум'
+    description = 'Новые публикации в Блогикуме.'
+
+    def get_cache_tags(self, **kwargs):
+        return (GLOBAL_TAG, INDEX_TAG)
+
+    def get_freshness_queryset(self, **kwargs):
+        return Post.objects.filter_is_published()
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.objects.select_related_fields().filter_is_published()
+
+    def items(self, obj):
+        return self.get_posts(obj)[:FEED_ITEM_COUNT]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return linebreaksbr(post.text)
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_author_link(self, post):
+        return reverse('blog:profile', args=(post.author.username,))
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_categories(self, post):
+        return (post.category.title,)
+
+
+class CategoryPostFeed(PostFeed):
+    """Feed of the latest posts in a category."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def get_cache_tags(self, category_slug, **kwargs):
+        return (GLOBAL_TAG, category_tag(category_slug))
+
+    def get_freshness_queryset(self, category_slug, **kwargs):
+        return Post.objects.filter_is_published().filter(
+            category__slug=category_slug
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+    def get_posts(self, category):
+        return super().get_posts(category).filter(category=category)
+
+
+class AuthorPostFeed(PostFeed):
+    """Feed of the latest published posts of an author."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(get_user_model(), username=username)
+
+    def get_cache_tags(self, username, **kwargs):
+        return (GLOBAL_TAG, profile_tag(username))
+
+    def get_freshness_queryset(self, username, **kwargs):
+        return Post.objects.filter_is_published().filter(
+            author__username=username
+        )
+
+    def title(self, author):
+        return f'Блогикум: публикации @{author.username}'
+
+    def description(self, author):
+        return f'Новые публикации пользователя @{author.username}.'
+
+    def link(self, author):
+        return reverse('blog:profile', args=(author.username,))
+
+    def get_posts(self, author):
+        return super().get_posts(author).filter(author=author)
+
+
+class AtomFeedMixin:
+    """Mixin. Publish the feed in Atom instead of RSS."""
+
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class PostAtomFeed(AtomFeedMixin, PostFeed):
+    pass
+
+
+class CategoryPostAtomFeed(AtomFeedMixin, CategoryPostFeed):
+    pass
+
+
+class AuthorPostAtomFeed(AtomFeedMixin, AuthorPostFeed):
+    pass
@@ -1,8 +1,55 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
+from .constants import IMAGE_MAX_PIXELS, IMAGE_MAX_UPLOAD_SIZE
 from .models import Post, Comment
 
 
+class BoundedImageField(forms.ImageField):
+    """Image field rejecting files over the size and pixel limits.
+
+    The dimensions are read from the image header before Django verifies
+    the file, so decompression bombs are rejected without being decoded.
+    """
+
+    default_error_messages = {
+        'file_too_large': (
+            'Размер файла не должен превышать %(max_size)s.'
+        ),
+        'too_many_pixels': (
+            'Изображение не должно быть больше %(max_pixels)s мегапикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        if data.size > IMAGE_MAX_UPLOAD_SIZE:
+            raise ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'max_size': filesizeformat(IMAGE_MAX_UPLOAD_SIZE)},
+            )
+        try:
+            with Image.open(data) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            width = height = IMAGE_MAX_PIXELS
+        except Exception:
+            # Let the parent class report a file which is not an image.
+            width = height = 0
+        if width * height > IMAGE_MAX_PIXELS:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'max_pixels': IMAGE_MAX_PIXELS // 1000000},
+            )
+        data.seek(0)
+        return super().to_python(data)
+
+
 class CommentForm(forms.ModelForm):
 
     class Meta:
@@ -15,6 +62,9 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {
+            'image': BoundedImageField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
@@ -0,0 +1,307 @@
+import logging
+import posixpath
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils.timezone import now
+from PIL import Image, ImageOps
+
+from .cache import invalidate_post_pages
+from .constants import (
+    IMAGE_MODERN_FORMATS, IMAGE_RESPONSIVE_WIDTHS, IMAGE_VARIANTS,
+    IMAGE_VARIANTS_DIR, IMAGE_VARIANTS_QUEUE_SIZE, IMAGE_VARIANTS_WORKERS
+)
+from .models import Post
+
+logger = logging.getLogger(__name__)
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+VARIANT_FILENAME = re.compile(
+    r'^(?P<stem>.+)_(?:{}|w\d+)\.\w+$'.format('|'.join(IMAGE_VARIANTS))
+)
+executor = ThreadPoolExecutor(
+    max_workers=IMAGE_VARIANTS_WORKERS, thread_name_prefix='image-variants'
+)
+# Jobs submitted to the executor and not finished yet.
+pending_variants = set()
+pending_variants_lock = threading.Lock()
+
+
+def get_variant_name(name, variant, extension=None):
+    """Return where the variant of an uploaded image is stored.
+
+    ``posts_images/photo.jpg`` gets ``posts_images/variants/photo_card.jpg``.
+    """
+    directory, filename = posixpath.split(name)
+    stem, original_extension = posixpath.splitext(filename)
+    return posixpath.join(
+        directory,
+        IMAGE_VARIANTS_DIR,
+        f'{stem}_{variant}{extension or original_extension}',
+    )
+
+
+def get_original_stem(variant_filename):
+    """Return the file name stem of the image a variant was made from."""
+    match = VARIANT_FILENAME.match(variant_filename)
+    return match['stem'] if match else None
+
+
+def get_width_variant_name(name, width, image_format):
+    """``posts_images/photo.jpg`` gets ``.../variants/photo_w640.webp``."""
+    return get_variant_name(name, f'w{width}', f'.{image_format.lower()}')
+
+
+@lru_cache(maxsize=None)
+def get_modern_formats():
+    """Return the ``(format, mime type)`` pairs Pillow is able to write."""
+    Image.init()
+    return tuple(
+        (image_format, mime_type)
+        for image_format, mime_type in IMAGE_MODERN_FORMATS.items()
+        if image_format in Image.SAVE
+    )
+
+
+def get_variant_url(image, variant):
+    """Return the URL of a variant, or of the original until it is ready.
+
+    Which variants exist is read from the metadata of the post, so no
+    request goes to the storage.
+    """
+    if variant in image.instance.image_metadata.get('variants', ()):
+        return image.storage.url(get_variant_name(image.name, variant))
+    return image.url
+
+
+def read_image_metadata(file):
+    """Read the dimensions and the format from the image header.
+
+    The dimensions are the ones the image is displayed with, after the
+    EXIF orientation is applied.
+    """
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+            image_format = image.format
+        size = file.size
+        file.seek(0)
+    except OSError:
+        return {}
+    return {
+        'width': width,
+        'height': height,
+        'format': image_format,
+        'size': size,
+    }
+
+
+def get_picture_sources(image):
+    """Return the ``<source>`` attributes for the modern format variants.
+
+    Only the formats and widths recorded in the metadata of the post are
+    listed.
+    """
+    sources = []
+    recorded = image.instance.image_metadata.get('sources', {})
+    for image_format, mime_type in get_modern_formats():
+        candidates = []
+        for width in recorded.get(image_format, ()):
+            name = get_width_variant_name(image.name, width, image_format)
+            candidates.append(f'{image.storage.url(name)} {width}w')
+        if candidates:
+            sources.append(
+                {'type': mime_type, 'srcset': ', '.join(candidates)}
+            )
+    return sources
+
+
+def get_responsive_widths(width):
+    """Return the variant widths of an image of the given width.
+
+    Widths beyond the image would only repeat it under a wrong ``w``
+    descriptor, so a narrower image gets a variant of its own width.
+    """
+    widths = [
+        responsive_width for responsive_width in IMAGE_RESPONSIVE_WIDTHS
+        if responsive_width < width
+    ]
+    return [*widths, min(width, IMAGE_RESPONSIVE_WIDTHS[-1])]
+
+
+def resize(image, size):
+    resized = image.copy()
+    resized.thumbnail(size, Image.LANCZOS)
+    return resized
+
+
+def save_image(storage, name, image, image_format):
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, optimize=True, quality=85)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_variants(name, storage):
+    """Resize an uploaded image to every size in ``IMAGE_VARIANTS``.
+
+    Besides the copies in the original format, the image is encoded in
+    the modern formats at the widths of ``IMAGE_RESPONSIVE_WIDTHS`` the
+    image has. Return the record of
+    the generated variants to keep in the metadata of the posts.
+    """
+    with storage.open(name) as file, Image.open(file) as original:
+        image_format = original.format
+        image = ImageOps.exif_transpose(original)
+        for variant, size in IMAGE_VARIANTS.items():
+            save_image(
+                storage,
+                get_variant_name(name, variant),
+                resize(image, size),
+                image_format,
+            )
+        if image.mode not in ('RGB', 'RGBA'):
+            transparent = (
+                'A' in image.getbands() or 'transparency' in image.info
+            )
+            image = image.convert('RGBA' if transparent else 'RGB')
+        sources = {}
+        widths = get_responsive_widths(image.width)
+        for modern_format, _ in get_modern_formats():
+            for width in widths:
+                save_image(
+                    storage,
+                    get_width_variant_name(name, width, modern_format),
+                    resize(image, (width, image.height)),
+                    modern_format,
+                )
+            sources[modern_format] = widths
+    return {'variants': list(IMAGE_VARIANTS), 'sources': sources}
+
+
+def update_image_posts(names, **fields):
+    """Mark the posts showing the images as changed.
+
+    The new ``updated_at`` changes the cache versions of their cards, the
+    list pages showing them are dropped. Return the number of posts.
+    """
+    posts = Post.objects.filter(image__in=names)
+    owners = set(posts.values_list('category_id', 'author_id'))
+    updated = posts.update(updated_at=now(), **fields)
+    invalidate_post_pages(
+        {category_id for category_id, _ in owners},
+        {author_id for _, author_id in owners},
+    )
+    return updated
+
+
+def store_variants(name, record):
+    """Keep the record of the variants in the metadata of the posts.
+
+    The cards showing the image get the new URLs. Return the number of
+    posts.
+    """
+    metadata = Post.objects.filter(image=name).values_list(
+        'image_metadata', flat=True
+    ).first()
+    if metadata is None:
+        return 0
+    return update_image_posts([name], image_metadata={**metadata, **record})
+
+
+def generate_post_variants(name):
+    try:
+        record = generate_variants(
+            name, Post._meta.get_field('image').storage
+        )
+    except Exception:
+        logger.exception('Не удалось создать уменьшенные копии %s', name)
+        return
+    store_variants(name, record)
+
+
+def generate_post_variants_in_thread(name):
+    try:
+        generate_post_variants(name)
+    finally:
+        connections.close_all()
+
+
+def get_variant_names(name, storage):
+    """Return the names of the stored variants of an image.
+
+    Narrow images have variants of their own width, so the directory is
+    listed rather than the names guessed.
+    """
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    variants_dir = posixpath.join(directory, IMAGE_VARIANTS_DIR)
+    try:
+        _, filenames = storage.listdir(variants_dir)
+    except FileNotFoundError:
+        return []
+    return [
+        posixpath.join(variants_dir, variant_filename)
+        for variant_filename in filenames
+        if get_original_stem(variant_filename) == stem
+    ]
+
+
+def delete_unreferenced_image(name):
+    """Delete the file and its variants once no post refers to it."""
+    if Post.objects.filter(image=name).exists():
+        return
+    storage = Post._meta.get_field('image').storage
+    for file_name in (name, *get_variant_names(name, storage)):
+        storage.delete(file_name)
+
+
+def release_image(name):
+    """Drop a reference to the file; it's deleted if that was the last."""
+    transaction.on_commit(lambda: delete_unreferenced_image(name))
+
+
+def submit_variants(name):
+    """Generate variants in the pool, or right away when it's backed up.
+
+    The queue is bounded, so a burst of uploads slows the requests down
+    instead of piling up work that is lost when the process stops.
+    """
+    with pending_variants_lock:
+        future = None
+        if len(pending_variants) < IMAGE_VARIANTS_QUEUE_SIZE:
+            future = executor.submit(generate_post_variants_in_thread, name)
+            pending_variants.add(future)
+    if future is None:
+        generate_post_variants(name)
+    else:
+        future.add_done_callback(forget_variants)
+
+
+def forget_variants(future):
+    with pending_variants_lock:
+        pending_variants.discard(future)
+
+
+def wait_for_variants(timeout=None):
+    """Block until the variants scheduled so far are generated."""
+    with pending_variants_lock:
+        futures = list(pending_variants)
+    wait(futures, timeout=timeout)
+
+
+def schedule_variants(name):
+    """Generate variants after the transaction commits, off the request."""
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: submit_variants(name))
+    else:
+        transaction.on_commit(lambda: generate_post_variants(name))
@@ -0,0 +1,253 @@
+import json
+from datetime import datetime
+from math import ceil
+from pathlib import Path
+from statistics import mean
+from time import perf_counter
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog import urls as blog_urls
+from blog.fake_data import seed
+from blog.models import Comment, Post
+from pages import urls as pages_urls
+
+MODES = ('anonymous', 'authenticated')
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, percent):
+    index = ceil(percent / 100 * len(sorted_values)) - 1
+    return sorted_values[max(index, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность и задержки всех страниц блога, '
+        'вызывая WSGI-приложение внутри процесса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Количество измеряемых запросов к каждой странице.',
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--mode', choices=(*MODES, 'both'), default='both',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            metavar='POSTS',
+            help=(
+                'Создать указанное число публикаций перед замером и '
+                'откатить все изменения после него.'
+            ),
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument(
+            '--output',
+            default='benchmark_results.jsonl',
+            help='Файл, в который дописываются результаты запусков.',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Сравнить результаты с предыдущим запуском из файла.',
+        )
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'Включён DEBUG: результаты будут хуже, чем в продакшене.'
+            ))
+        # Like the test client, keep one connection for all requests so that
+        # they run inside the transaction that is rolled back afterwards.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    seed(
+                        users=max(options['seed'] // 100, 1),
+                        posts=options['seed'],
+                        comments=options['seed'] * 5,
+                    )
+                results = self.run(options)
+                transaction.set_rollback(True)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        record = {
+            'started_at': now().isoformat(),
+            'label': options['label'],
+            'requests': options['requests'],
+            'results': results,
+        }
+        output = Path(options['output'])
+        previous = self.read_last_record(output) if options['compare'] else {}
+        self.print_results(results, previous.get('results', {}))
+        with output.open('a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        failed = [name for name, result in results.items() if result['error']]
+        if failed:
+            for name in failed:
+                self.stderr.write(self.style.ERROR(
+                    f'{name}: {results[name]["url"]} ответила со статусом '
+                    f'{",".join(map(str, results[name]["status"]))}'
+                ))
+            raise CommandError(
+                f'Страниц с ошибками: {len(failed)}. Их замеры не отражают '
+                'работу страниц.'
+            )
+
+    def run(self, options):
+        post, comment = self.get_sample_objects()
+        kwargs = {
+            'post_id': post.id,
+            'comment_id': comment.id,
+            'category_slug': post.category.slug,
+            'username': post.author.username,
+        }
+        client = Client()
+        client.force_login(post.author)
+        cookies = {
+            'anonymous': '',
+            'authenticated': '; '.join(
+                f'{name}={morsel.value}'
+                for name, morsel in client.cookies.items()
+            ),
+        }
+        modes = MODES if options['mode'] == 'both' else (options['mode'],)
+        application = get_wsgi_application()
+
+        results = {}
+        for name, url in self.get_urls(kwargs):
+            for mode in modes:
+                results[f'{name} {mode}'] = self.measure(
+                    application, url, cookies[mode],
+                    options['requests'], options['warmup'],
+                )
+        return results
+
+    def get_sample_objects(self):
+        post = (
+            Post.objects
+            .select_related_fields()
+            .filter_is_published()
+            .filter(comment_count__gt=0)
+            .order_by('-comment_count')
+            .first()
+        )
+        if post is None:
+            raise CommandError(
+                'Нет опубликованных публикаций с комментариями. '
+                'Запустите команду с параметром --seed.'
+            )
+        comment = (
+            Comment.objects.filter(post=post, author=post.author).first()
+            or post.comments.first()
+        )
+        return post, comment
+
+    def get_urls(self, kwargs):
+        for module in (blog_urls, pages_urls):
+            for pattern in module.urlpatterns:
+                name = f'{module.app_name}:{pattern.name}'
+                route_kwargs = {
+                    key: kwargs[key] for key in pattern.pattern.converters
+                }
+                yield name, reverse(name, kwargs=route_kwargs)
+
+    def call(self, application, url, cookie):
+        parts = urlsplit(url)
+        environ = {
+            'PATH_INFO': parts.path,
+            'QUERY_STRING': parts.query,
+            'HTTP_COOKIE': cookie,
+            'REMOTE_ADDR': '192.0.2.1',
+        }
+        setup_testing_defaults(environ)
+        status = []
+        body = application(
+            environ, lambda code, headers, exc_info=None: status.append(code)
+        )
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return int(status[0].split()[0])
+
+    def measure(self, application, url, cookie, requests, warmup):
+        for _ in range(warmup):
+            self.call(application, url, cookie)
+        latencies = []
+        queries = []
+        statuses = set()
+        started = perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as context:
+                request_start = perf_counter()
+                statuses.add(self.call(application, url, cookie))
+                latencies.append((perf_counter() - request_start) * 1000)
+            queries.append(len(context.captured_queries))
+        elapsed = perf_counter() - started
+        latencies.sort()
+        return {
+            'url': url,
+            'status': sorted(statuses),
+            # Error pages are fast and would pass for an improvement.
+            'error': not all(200 <= status < 400 for status in statuses),
+            'rps': round(requests / elapsed, 1),
+            **{
+                f'p{percent}_ms': round(percentile(latencies, percent), 2)
+                for percent in PERCENTILES
+            },
+            'queries': round(mean(queries), 1),
+        }
+
+    def read_last_record(self, path):
+        if not path.exists():
+            return {}
+        last_line = ''
+        with path.open(encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    last_line = line
+        return json.loads(last_line) if last_line else {}
+
+    def print_results(self, results, previous):
+        columns = ('rps', *(f'p{p}_ms' for p in PERCENTILES), 'queries')
+        self.stdout.write(
+            f'{"Страница":<40}{"Статус":>10}'
+            + ''.join(f'{column:>18}' for column in columns)
+        )
+        for name, result in results.items():
+            cells = []
+            for column in columns:
+                cell = f'{result[column]}'
+                if name in previous:
+                    cell += f' ({result[column] - previous[name][column]:+g})'
+                cells.append(f'{cell:>18}')
+            status = ','.join(map(str, result['status']))
+            line = f'{name:<40}{status:>10}' + ''.join(cells)
+            self.stdout.write(
+                self.style.ERROR(line) if result['error'] else line
+            )
+        self.stdout.write(f'Запуск от {datetime.now():%Y-%m-%d %H:%M}')
@@ -0,0 +1,130 @@
+import posixpath
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils.timezone import now
+
+from blog.constants import IMAGE_VARIANTS_DIR
+from blog.images import get_original_stem
+from blog.models import Post
+
+
+def listdir(storage, directory):
+    # Object stores have no directories, just nothing under the prefix.
+    try:
+        return storage.listdir(directory)
+    except FileNotFoundError:
+        return [], []
+
+
+def walk(storage, directory):
+    """Yield every directory with its files, variants aside, depth first.
+
+    Only one directory listing is held in memory at a time.
+    """
+    directories, files = listdir(storage, directory)
+    yield directory, files
+    for name in sorted(directories):
+        if name != IMAGE_VARIANTS_DIR:
+            yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения, на которые не ссылается ни одна публикация, '
+        'вместе с их уменьшенными копиями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести найденные файлы, ничего не удаляя.',
+        )
+        parser.add_argument(
+            '--quarantine',
+            metavar='DIRECTORY',
+            help='Переместить файлы в указанный каталог вместо удаления.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=24,
+            metavar='HOURS',
+            help=(
+                'Не трогать файлы моложе указанного числа часов: '
+                'публикация с ними может быть ещё не сохранена.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество имён файлов, проверяемых одним запросом.',
+        )
+
+    def handle(self, *args, dry_run, quarantine, min_age, batch_size,
+               **options):
+        self.storage = Post._meta.get_field('image').storage
+        self.dry_run = dry_run
+        self.quarantine = Path(quarantine) if quarantine else None
+        self.created_before = now() - timedelta(hours=min_age)
+        self.batch_size = batch_size
+        self.verbosity = options['verbosity']
+        self.collected = 0
+        self.collected_size = 0
+
+        upload_to = Post._meta.get_field('image').upload_to
+        for directory, files in walk(self.storage, upload_to):
+            self.collect_directory(directory, files)
+
+        action = 'Найдено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {self.collected} '
+            f'({filesizeformat(self.collected_size)})'
+        ))
+
+    def get_referenced(self, names):
+        referenced = set()
+        for start in range(0, len(names), self.batch_size):
+            referenced.update(Post.objects.filter(
+                image__in=names[start:start + self.batch_size]
+            ).values_list('image', flat=True))
+        return referenced
+
+    def collect_directory(self, directory, files):
+        names = [posixpath.join(directory, filename) for filename in files]
+        referenced = self.get_referenced(names)
+        referenced_stems = {
+            posixpath.splitext(posixpath.basename(name))[0]
+            for name in referenced
+        }
+        for name in names:
+            if name not in referenced:
+                self.collect(name)
+
+        variants_directory = posixpath.join(directory, IMAGE_VARIANTS_DIR)
+        for filename in listdir(self.storage, variants_directory)[1]:
+            # A variant is kept while the image it was made from is used.
+            if get_original_stem(filename) not in referenced_stems:
+                self.collect(posixpath.join(variants_directory, filename))
+
+    def collect(self, name):
+        if self.storage.get_modified_time(name) > self.created_before:
+            return
+        self.collected += 1
+        self.collected_size += self.storage.size(name)
+        if self.verbosity >= 2 or self.dry_run:
+            self.stdout.write(name)
+        if self.dry_run:
+            return
+        if self.quarantine is not None:
+            path = self.quarantine / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with self.storage.open(name) as source:
+                with path.open('wb') as target:
+                    for chunk in source.chunks():
+                        target.write(chunk)
+        self.storage.delete(name)
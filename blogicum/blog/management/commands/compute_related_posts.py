@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import RELATED_POSTS_BATCH_SIZE
+from blog.related import update_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассчитывает похожие публикации для публикаций, изменённых '
+        'с прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать похожие публикации для всех публикаций.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RELATED_POSTS_BATCH_SIZE,
+            help='Количество публикаций, сравниваемых за один шаг.',
+        )
+
+    def handle(self, *args, full, batch_size, **options):
+        computed = update_related_posts(full=full, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рассчитаны похожие публикации для публикаций: {computed}'
+        ))
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from blog.constants import MAX_OBJECT_COUNT_ON_PAGE
+from blog.models import Category, Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит планы выполнения запросов страниц блога, чтобы проверить '
+        'использование индексов.'
+    )
+
+    def handle(self, *args, **options):
+        published = Post.objects.select_related_fields().filter_is_published()
+        querysets = {'Лента публикаций': published}
+
+        category = Category.objects.filter(is_published=True).first()
+        if category is not None:
+            querysets['Публикации категории'] = published.filter(
+                category=category
+            )
+
+        author = get_user_model().objects.first()
+        if author is not None:
+            querysets['Публикации пользователя'] = (
+                Post.objects.select_related_fields().filter(author=author)
+            )
+
+        post = Post.objects.first()
+        if post is not None:
+            querysets['Комментарии публикации'] = (
+                Comment.objects.select_related('author').filter(post=post)
+            )
+
+        for title, queryset in querysets.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(
+                queryset[:MAX_OBJECT_COUNT_ON_PAGE].explain()
+            )
@@ -0,0 +1,180 @@
+import json
+from argparse import ArgumentTypeError
+from contextlib import ExitStack
+from datetime import datetime, time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from blog.models import Category, Comment, Location, Post
+
+
+def moment(value):
+    """Parse a date or a date and time given on the command line."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ArgumentTypeError(
+                f'Неверная дата: {value}. Ожидается ГГГГ-ММ-ДД[ ЧЧ:ММ[:СС]].'
+            )
+        parsed = datetime.combine(date, time())
+    return make_aware(parsed) if is_naive(parsed) else parsed
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """Keep the microseconds DjangoJSONEncoder rounds off.
+
+    Exports since a timestamp compare it with the exact stored times.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def get_exported_fields(model):
+    return [field for field in model._meta.concrete_fields if field.serialize]
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает категории, местоположения, публикации, комментарии '
+        'и их авторов в формате JSON Lines, по одному объекту в строке, '
+        'не загружая их в память целиком. Файл можно загрузить командой '
+        'loaddata. Группы и права пользователей не выгружаются. '
+        'Если публикации отобраны по категории или дате, выгружаются только '
+        'их категории, местоположения, комментарии и авторы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            metavar='FILE',
+            help='Записать выгрузку в файл вместо стандартного вывода.',
+        )
+        parser.add_argument(
+            '--category',
+            action='append',
+            metavar='SLUG',
+            help=(
+                'Выгрузить только публикации указанной категории; '
+                'можно указать несколько раз.'
+            ),
+        )
+        parser.add_argument(
+            '--published-after',
+            type=moment,
+            metavar='DATE',
+            help='Выгрузить публикации, опубликованные начиная с даты.',
+        )
+        parser.add_argument(
+            '--published-before',
+            type=moment,
+            metavar='DATE',
+            help='Выгрузить публикации, опубликованные до даты.',
+        )
+        parser.add_argument(
+            '--since',
+            type=moment,
+            metavar='DATE',
+            help=(
+                'Выгрузить только объекты, добавленные или изменённые '
+                'начиная с указанного времени, и авторов выгруженных '
+                'публикаций и комментариев.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Количество строк, читаемых из базы данных за раз.',
+        )
+
+    def get_querysets(self, category, published_after, published_before,
+                      since):
+        categories = Category.objects.all()
+        locations = Location.objects.all()
+        posts = Post.objects.all()
+        if category:
+            posts = posts.filter(category__slug__in=category)
+        if published_after:
+            posts = posts.filter(pub_date__gte=published_after)
+        if published_before:
+            posts = posts.filter(pub_date__lt=published_before)
+        comments = Comment.objects.all()
+        if posts.query.has_filters():
+            # Only what the selected posts reference is exported with them.
+            categories = categories.filter(pk__in=posts.values('category'))
+            locations = locations.filter(pk__in=posts.values('location'))
+            comments = comments.filter(post__in=posts)
+        if since:
+            categories = categories.filter(updated_at__gte=since)
+            locations = locations.filter(updated_at__gte=since)
+            posts = posts.filter(updated_at__gte=since)
+            comments = comments.filter(
+                Q(created_at__gte=since) | Q(edit__updated_at__gte=since)
+            )
+        users = get_user_model().objects.filter(
+            Q(pk__in=posts.values('author'))
+            | Q(pk__in=comments.values('author'))
+        )
+        # Referenced objects go first, so the file loads in one pass.
+        return categories, locations, users, posts, comments
+
+    def export(self, queryset, stream, chunk_size):
+        model = queryset.model
+        label = model._meta.label_lower
+        fields = get_exported_fields(model)
+        rows = (
+            queryset.order_by('pk')
+            .values_list('pk', *(field.attname for field in fields))
+            .iterator(chunk_size=chunk_size)
+        )
+        count = 0
+        for pk, *values in rows:
+            stream.write(json.dumps(
+                {
+                    'model': label,
+                    'pk': pk,
+                    'fields': {
+                        field.name: value
+                        for field, value in zip(fields, values)
+                    },
+                },
+                cls=ExportEncoder,
+                ensure_ascii=False,
+            ) + '\n')
+            count += 1
+        return label, count
+
+    def handle(self, *args, output, chunk_size, **options):
+        # Taken before reading, so nothing falls between two exports.
+        started_at = now()
+        querysets = self.get_querysets(
+            options['category'],
+            options['published_after'],
+            options['published_before'],
+            options['since'],
+        )
+        with ExitStack() as stack:
+            stream = (
+                stack.enter_context(open(output, 'w', encoding='utf-8'))
+                if output else self.stdout
+            )
+            counts = [
+                self.export(queryset, stream, chunk_size)
+                for queryset in querysets
+            ]
+        if output:
+            for label, count in counts:
+                self.stdout.write(f'{label}: {count}')
+            self.stdout.write(self.style.SUCCESS(
+                'Выгрузка завершена. Для следующей выгрузки изменений: '
+                f'--since "{started_at.isoformat()}"'
+            ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import read_image_metadata, update_image_posts
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет размеры, формат и размер файла изображений публикаций, '
+        'загруженных до появления этих сведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Перечитать сведения и для уже заполненных публикаций.',
+        )
+
+    def handle(self, *args, refresh, **options):
+        posts = Post.objects.exclude(image='')
+        if not refresh:
+            posts = posts.filter(image_metadata={})
+        names = posts.order_by('image').values_list('image', flat=True)
+        storage = Post._meta.get_field('image').storage
+
+        filled = 0
+        # Shared files are read once for all the posts showing them.
+        for name in names.distinct().iterator():
+            try:
+                with storage.open(name) as file:
+                    metadata = read_image_metadata(file)
+            except FileNotFoundError:
+                self.stderr.write(f'Файл не найден: {name}')
+                continue
+            # The record of the variants is kept.
+            existing = Post.objects.filter(image=name).values_list(
+                'image_metadata', flat=True
+            ).first() or {}
+            # The cards and the pages showing the image get the attributes.
+            filled += update_image_posts(
+                [name], image_metadata={**existing, **metadata}
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Заполнено публикаций: {filled}')
+        )
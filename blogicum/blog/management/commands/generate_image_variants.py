@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import generate_variants, get_modern_formats, store_variants
+from blog.models import Post
+
+
+def get_storage():
+    return Post._meta.get_field('image').storage
+
+
+def generate(name):
+    return generate_variants(name, get_storage())
+
+
+def has_variants(metadata):
+    """Tell whether the variants in every modern format are recorded."""
+    return all(
+        image_format in metadata.get('sources', {})
+        for image_format, _ in get_modern_formats()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии и варианты в современных форматах '
+        'для уже загруженных изображений публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество параллельных процессов.',
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Обработать только изображения без вариантов.',
+        )
+
+    def handle(self, *args, workers, missing, **options):
+        images = (
+            Post.objects
+            .exclude(image='')
+            .order_by('image')
+            .values_list('image', 'image_metadata')
+        )
+        names = sorted({
+            name for name, metadata in images.iterator()
+            if not (missing and has_variants(metadata))
+        })
+        # Forked workers must not share the connection of this process.
+        connections.close_all()
+
+        done = 0
+        failed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(generate, name): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    record = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                else:
+                    store_variants(name, record)
+                    done += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {done}')
+        )
+        if failed:
+            self.stdout.write(
+                self.style.ERROR(f'Не удалось обработать: {failed}')
+            )
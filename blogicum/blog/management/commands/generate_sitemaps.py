@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import update_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает карты сайта с публикациями, категориями и профилями '
+        'в SITEMAPS_ROOT. Перезаписываются только файлы, содержимое '
+        'которых изменилось с прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Перезаписать все файлы.',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=settings.SITEMAPS_BASE_URL,
+            help='Адрес сайта, с которого начинаются ссылки.',
+        )
+
+    def handle(self, *args, full, base_url, **options):
+        written, deleted = update_sitemaps(
+            settings.SITEMAPS_ROOT, base_url, full=full
+        )
+        if options['verbosity'] >= 2:
+            for name in written:
+                self.stdout.write(f'Записан: {name}')
+            for name in deleted:
+                self.stdout.write(f'Удалён: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано файлов: {len(written)}, удалено: {len(deleted)}'
+        ))
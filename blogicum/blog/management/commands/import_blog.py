@@ -0,0 +1,229 @@
+import json
+from collections import Counter
+from contextlib import contextmanager
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.timezone import now
+
+from blog.cache import GLOBAL_TAG, forget_next_publication, invalidate_tags
+from blog.models import Category, Comment, Location, Post
+from blog.search import drop_search_triggers, ensure_search_index
+
+READ_CHUNK_SIZE = 64 * 1024
+# Longer unparsed tails mean a broken file rather than a large object.
+MAX_OBJECT_SIZE = 16 * 1024 * 1024
+# Separators and brackets between the objects of a JSON array.
+ARRAY_PUNCTUATION = ' \t\r\n,['
+
+
+def read_array(file, chunk_size=READ_CHUNK_SIZE,
+               max_object_size=MAX_OBJECT_SIZE):
+    """Yield the objects of a JSON array without reading it whole.
+
+    Only the unparsed tail of the last chunk is kept in memory, and no
+    more than ``max_object_size`` characters of it.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while True:
+        chunk = file.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            while (
+                position < len(buffer)
+                and buffer[position] in ARRAY_PUNCTUATION
+            ):
+                position += 1
+            if position == len(buffer) or buffer[position] == ']':
+                break
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The object continues in the next chunk.
+                break
+            yield obj
+        buffer = buffer[position:]
+        if len(buffer) > max_object_size:
+            raise CommandError(
+                f'Не удалось разобрать JSON: объект длиннее '
+                f'{max_object_size} символов: {buffer[:100]!r}'
+            )
+        if not chunk:
+            if buffer.strip() not in ('', ']'):
+                raise CommandError(
+                    f'Не удалось разобрать JSON: {buffer[:100]!r}'
+                )
+            return
+
+
+def read_lines(file):
+    """Yield the objects of a JSON Lines file."""
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+
+def read_objects(file):
+    """Yield objects of a dumpdata fixture or a JSON Lines dump."""
+    start = file.read(1)
+    while start.isspace():
+        start = file.read(1)
+    file.seek(0)
+    return read_array(file) if start == '[' else read_lines(file)
+
+
+@contextmanager
+def stored_timestamps(models):
+    """Keep the times from the dump instead of setting the current one."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает категории, местоположения, пользователей, '
+        'публикации и комментарии из фикстуры dumpdata или выгрузки '
+        'export_blog. Объекты читаются потоком и вставляются пачками без '
+        'сигналов, затем пересчитываются счётчики комментариев и '
+        'поисковый индекс. Остальные модели, а также группы и права '
+        'пользователей пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Файл JSON или JSON Lines.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Количество объектов, вставляемых одной транзакцией.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать объекты, которые уже есть в базе данных.',
+        )
+
+    def handle(self, *args, fixture, batch_size, ignore_conflicts,
+               **options):
+        # Referenced models go first in every batch.
+        self.models = (
+            Category, Location, get_user_model(), Post, Comment
+        )
+        self.labels = {model._meta.label_lower for model in self.models}
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.loaded = Counter()
+        self.skipped = Counter()
+        connection = connections[DEFAULT_DB_ALIAS]
+
+        started = monotonic()
+        drop_search_triggers()
+        try:
+            # Objects may reference ones from a later batch, so the keys
+            # are checked once everything is inserted.
+            with connection.constraint_checks_disabled():
+                self.load(fixture)
+            connection.check_constraints(table_names=[
+                model._meta.db_table for model in self.models
+            ])
+        finally:
+            ensure_search_index()
+        elapsed = monotonic() - started
+
+        self.reset_sequences(connection)
+        call_command('recount_comments', stdout=self.stdout)
+        invalidate_tags(GLOBAL_TAG)
+        forget_next_publication()
+        self.report(elapsed)
+
+    def load(self, fixture):
+        batches = {model: [] for model in self.models}
+        with stored_timestamps(self.models) as timestamp_fields, open(
+            fixture, encoding='utf-8'
+        ) as file:
+            started_at = now()
+            pending = 0
+            for deserialized in Deserializer(
+                self.select(read_objects(file)), ignorenonexistent=True
+            ):
+                obj = deserialized.object
+                # Fields missing from old dumps get the time of the load.
+                for field in timestamp_fields:
+                    if getattr(obj, field.attname, '') is None:
+                        setattr(obj, field.attname, started_at)
+                batches[type(obj)].append(obj)
+                pending += 1
+                if pending >= self.batch_size:
+                    self.flush(batches)
+                    pending = 0
+            self.flush(batches)
+
+    def select(self, objects):
+        for obj in objects:
+            if obj.get('model') in self.labels:
+                yield obj
+            else:
+                self.skipped[obj.get('model')] += 1
+
+    def flush(self, batches):
+        with transaction.atomic():
+            for model, objs in batches.items():
+                if objs:
+                    label = model._meta.label_lower
+                    inserted = self.insert(model, objs)
+                    self.loaded[label] += inserted
+                    if inserted < len(objs):
+                        self.skipped[label] += len(objs) - inserted
+                    objs.clear()
+
+    def insert(self, model, objs):
+        """Insert the objects and return how many rows were added."""
+        if not self.ignore_conflicts:
+            model.objects.bulk_create(objs)
+            return len(objs)
+        # Skipped rows are not reported back, so the table is counted.
+        count = model.objects.count()
+        model.objects.bulk_create(objs, ignore_conflicts=True)
+        return model.objects.count() - count
+
+    def reset_sequences(self, connection):
+        """Move sequences past the inserted keys, where there are any."""
+        sql = connection.ops.sequence_reset_sql(no_style(), self.models)
+        if sql:
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
+
+    def report(self, elapsed):
+        for label, count in self.loaded.items():
+            self.stdout.write(f'{label}: {count}')
+        for label, count in self.skipped.items():
+            self.stdout.write(f'{label}: {count} (пропущено)')
+        total = sum(self.loaded.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} объектов в секунду)'
+        ))
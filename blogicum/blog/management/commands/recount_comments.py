@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённое количество комментариев у публикаций '
+        'и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество публикаций, пересчитываемых одним запросом.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = Post.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        fixed = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                fixed += (
+                    Post.objects
+                    .filter(id__gt=start, id__lte=start + batch_size)
+                    .recount_comments()
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков комментариев: {fixed}')
+        )
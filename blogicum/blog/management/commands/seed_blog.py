@@ -0,0 +1,40 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.fake_data import seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу данных сгенерированными публикациями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--random-seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора для воспроизводимых данных.',
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        with transaction.atomic():
+            seed(
+                users=options['users'],
+                categories=options['categories'],
+                locations=options['locations'],
+                posts=options['posts'],
+                comments=options['comments'],
+                batch_size=options['batch_size'],
+                random_seed=options['random_seed'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {perf_counter() - started:.1f} с.'
+        ))
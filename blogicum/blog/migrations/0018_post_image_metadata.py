@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Ширина, высота, формат и размер файла изображения.', verbose_name='Сведения об изображении'),
+        ),
+    ]
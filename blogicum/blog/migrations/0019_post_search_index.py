@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# External content table: it holds only the inverted index and reads the
+# text from blog_post, the triggers keep it in sync with every write,
+# bulk_create() and update() included. The SQL is spelled out, so changes
+# to blog.search don't change what the migration does.
+CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE blog_post_fts USING fts5(
+        title, text,
+        content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_fts_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_fts (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_fts_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_fts (blog_post_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_post_fts_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO blog_post_fts (blog_post_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO blog_post_fts (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO blog_post_fts (blog_post_fts) VALUES ('rebuild')",
+)
+DROP_INDEX = (
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+    'DROP TABLE blog_post_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # Other databases fall back to a substring search.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEX), run_on_sqlite(DROP_INDEX)
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# Built like the index of posts in 0019, with the SQL spelled out as well.
+CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE blog_comment_fts USING fts5(
+        text,
+        content='blog_comment', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_fts_insert
+    AFTER INSERT ON blog_comment BEGIN
+        INSERT INTO blog_comment_fts (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_fts_delete
+    AFTER DELETE ON blog_comment BEGIN
+        INSERT INTO blog_comment_fts (blog_comment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_fts_update
+    AFTER UPDATE OF text ON blog_comment BEGIN
+        INSERT INTO blog_comment_fts (blog_comment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO blog_comment_fts (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO blog_comment_fts (blog_comment_fts) VALUES ('rebuild')",
+)
+DROP_INDEX = (
+    'DROP TRIGGER IF EXISTS blog_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_update',
+    'DROP TABLE blog_comment_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # Other databases fall back to a substring search.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEX), run_on_sqlite(DROP_INDEX)
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_computations(apps, schema_editor):
+    RelatedPost = apps.get_model('blog', 'RelatedPost')
+    RelatedPostsComputation = apps.get_model(
+        'blog', 'RelatedPostsComputation'
+    )
+    RelatedPostsComputation.objects.bulk_create(
+        RelatedPostsComputation(post_id=post_id, computed_at=computed_at)
+        for post_id, computed_at in (
+            RelatedPost.objects
+            .order_by()
+            .values('post')
+            .annotate(computed_at=models.Max('computed_at'))
+            .values_list('post', 'computed_at')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_related_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPostsComputation',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related_posts_computation', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('computed_at', models.DateTimeField(verbose_name='Рассчитано')),
+            ],
+            options={
+                'verbose_name': 'расчёт похожих публикаций',
+                'verbose_name_plural': 'Расчёты похожих публикаций',
+            },
+        ),
+        migrations.RunPython(fill_computations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_related_posts_computation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relatedpostscomputation',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Хэш содержимого'),
+        ),
+    ]
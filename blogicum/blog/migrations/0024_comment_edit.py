@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_related_posts_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentEdit',
+            fields=[
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='edit', serialize=False, to='blog.comment', verbose_name='Комментарий')),
+                ('updated_at', models.DateTimeField(db_index=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'изменение комментария',
+                'verbose_name_plural': 'Изменения комментариев',
+            },
+        ),
+    ]
@@ -1,14 +1,37 @@
+from calendar import timegm
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.urls import reverse
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
+from .cache import (
+    get_cache_timeout, get_page_cache_key, get_posts_last_modified,
+    get_tags_version
+)
+from .constants import PAGE_CACHE_TIMEOUT
 from .models import Comment, Post
 from .forms import CommentForm, PostForm
+from .paginators import KeysetPaginator
 
 
 class AuthorVerificationMixin(UserPassesTestMixin):
+    """Let only the author through. The object is fetched once per request."""
+
+    object_data = None
+
+    def get_object(self, queryset=None):
+        if self.object_data is None:
+            self.object_data = super().get_object(queryset)
+        return self.object_data
+
     def test_func(self):
-        return self.request.user == self.get_object().author
+        return self.request.user.pk == self.get_object().author_id
 
 
 class PostMixin(LoginRequiredMixin, AuthorVerificationMixin):
@@ -17,6 +40,9 @@ class PostMixin(LoginRequiredMixin, AuthorVerificationMixin):
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.select_related('location')
+
     def get_success_url(self):
         return reverse(
             'blog:profile', kwargs={'username': self.request.user.username}
@@ -24,7 +50,7 @@ class PostMixin(LoginRequiredMixin, AuthorVerificationMixin):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = PostForm(instance=self.get_object())
+        context.setdefault('form', PostForm(instance=self.object))
         return context
 
     def handle_no_permission(self):
@@ -44,3 +70,129 @@ class CommentMixin(LoginRequiredMixin):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class KeysetPaginationMixin:
+    """Paginate by cursor instead of page number when it is switched on."""
+
+    keyset_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.POSTS_KEYSET_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.keyset_ordering
+        )
+        page = paginator.get_page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Cache whole rendered pages for anonymous visitors.
+
+    Pages are stored under the tags returned by ``get_cache_tags`` and drop
+    out of the cache as soon as one of the tags is invalidated or the next
+    scheduled post gets published.
+    """
+
+    def get_cache_tags(self):
+        raise NotImplementedError(
+            'Define get_cache_tags() in AnonymousPageCacheMixin subclass'
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = get_page_cache_key(request, self.get_cache_tags())
+        content = cache.get(key)
+        if content is not None:
+            response = HttpResponse(content)
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        key,
+                        rendered.content,
+                        get_cache_timeout(PAGE_CACHE_TIMEOUT),
+                    )
+                )
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class ConditionalGetMixin:
+    """Answer 304 Not Modified from ETag and Last-Modified.
+
+    Both are computed before the page is built, from ``get_last_modified``
+    and ``get_etag_parts``. The ETag also depends on the visitor, because the
+    page shows their name and their CSRF token.
+    """
+
+    def get_last_modified(self):
+        raise NotImplementedError(
+            'Define get_last_modified() in ConditionalGetMixin subclass'
+        )
+
+    def get_etag_parts(self):
+        return ()
+
+    def get_etag(self, last_modified):
+        parts = (
+            self.request.get_full_path(),
+            last_modified.isoformat(),
+            self.request.user.pk,
+            self.request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+            *self.get_etag_parts(),
+        )
+        return quote_etag(
+            md5('|'.join(map(str, parts)).encode()).hexdigest()
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        last_modified = self.get_last_modified()
+        etag = self.get_etag(last_modified)
+        timestamp = timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class PostListCacheMixin(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin
+):
+    """Caching and pagination shared by the post list pages."""
+
+    def get_freshness_queryset(self):
+        """Return posts whose publication changes the page."""
+        raise NotImplementedError(
+            'Define get_freshness_queryset() in PostListCacheMixin subclass'
+        )
+
+    def get_last_modified(self):
+        return get_posts_last_modified(
+            self.get_freshness_queryset(),
+            self.get_cache_tags(),
+            PAGE_CACHE_TIMEOUT,
+            variant=self.request.user.pk,
+        )
+
+    def get_etag_parts(self):
+        return (get_tags_version(self.get_cache_tags()),)
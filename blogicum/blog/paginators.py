@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .constants import ADMIN_COUNT_LIMIT
+
+
+class KeysetPage(Sequence):
+    """Page of a keyset paginator. Knows only its neighbours."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """Paginate a queryset by the values of its ordering fields.
+
+    Pages are addressed by an opaque cursor holding the ordering values of
+    the last (or first) object of the neighbouring page, so every page costs
+    one indexed range scan and no ``COUNT(*)``. The ordering has to be unique,
+    so it should end with the primary key.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def get_page(self, after=None, before=None):
+        if before:
+            return self._get_page_before(self.decode_cursor(before))
+        values = self.decode_cursor(after) if after else None
+        return self._get_page_after(values)
+
+    def _get_page_after(self, values):
+        queryset = self.queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._build_filter(values))
+        object_list = list(queryset[:self.per_page + 1])
+        has_next = len(object_list) > self.per_page
+        return KeysetPage(
+            object_list[:self.per_page], self, has_next, values is not None
+        )
+
+    def _get_page_before(self, values):
+        queryset = (
+            self.queryset
+            .order_by(*self._reversed_ordering())
+            .filter(self._build_filter(values, reverse=True))
+        )
+        object_list = list(queryset[:self.per_page + 1])
+        has_previous = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page][::-1]
+        return KeysetPage(object_list, self, True, has_previous)
+
+    def _reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def _build_filter(self, values, reverse=False):
+        """Build ``(a, b) < (x, y)`` as ``a < x OR (a = x AND b < y)``."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, obj):
+        values = [
+            getattr(obj, field.lstrip('-')) for field in self.ordering
+        ]
+        data = json.dumps(values, cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(data)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise Http404('Неверный курсор страницы.')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise Http404('Неверный курсор страницы.')
+        return [
+            self._to_python(field.lstrip('-'), value)
+            for field, value in zip(self.ordering, values)
+        ]
+
+    def _to_python(self, name, value):
+        # Ordering values are never null, and a null would match nothing.
+        if value is None or isinstance(value, (dict, list)):
+            raise Http404('Неверный курсор страницы.')
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        try:
+            return field.to_python(value)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404('Неверный курсор страницы.')
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more rows than it has to.
+
+    An unfiltered table is estimated by its largest primary key, which
+    the index gives at once, and a filtered one is counted up to
+    ``ADMIN_COUNT_LIMIT`` rows.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not queryset.query.where:
+            return queryset.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+        return queryset[:ADMIN_COUNT_LIMIT].count()
@@ -0,0 +1,401 @@
+"""Related posts by text similarity and a shared category or location.
+
+Posts become TF-IDF vectors over hashed words of their title and text and
+are compared in NumPy batches by the ``compute_related_posts`` command.
+A post has few distinct words, so the vectors are kept as a sparse CSR
+matrix and only the compared rows are made dense.
+The neighbours are stored in ``RelatedPost``, so the post page only reads
+them by index, and the time of the computation in
+``RelatedPostsComputation``.
+"""
+import hashlib
+import re
+import zlib
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils.timezone import now
+
+from .constants import (
+    RELATED_CATEGORY_BONUS, RELATED_LOCATION_BONUS, RELATED_POSTS_BATCH_SIZE,
+    RELATED_POSTS_CHUNK_SIZE, RELATED_POSTS_DIMENSIONS, RELATED_POSTS_STORED,
+    RELATED_TITLE_WEIGHT
+)
+from .models import Post, RelatedPost, RelatedPostsComputation
+
+WORD = re.compile(r'\w{3,}')
+# Marks a missing category or location, which is shared with nobody.
+NO_LABEL = -1
+
+
+class PostVectors:
+    """Normalized vectors of posts with their categories and locations.
+
+    Row ``i`` of the matrix has the values ``data[indptr[i]:indptr[i + 1]]``
+    in the columns ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+
+    def __init__(self, ids, categories, locations, indptr, indices, data,
+                 dimensions):
+        self.ids = ids
+        self.categories = np.array(categories, dtype=np.int64)
+        self.locations = np.array(locations, dtype=np.int64)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.dimensions = dimensions
+        self.rows = {post_id: row for row, post_id in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dense(self, rows):
+        """Return the vectors of the rows as a dense matrix."""
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        # Positions of the values of every row, one after another.
+        positions = np.repeat(
+            starts - np.cumsum(lengths) + lengths, lengths
+        ) + np.arange(lengths.sum())
+        matrix = np.zeros((len(rows), self.dimensions), dtype=np.float32)
+        matrix[
+            np.repeat(np.arange(len(rows)), lengths), self.indices[positions]
+        ] = self.data[positions]
+        return matrix
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def hash_words(text, dimensions):
+    """Return the columns and signs of the words of the text.
+
+    CRC32 is used instead of ``hash()``, which changes between processes.
+    The sign makes colliding words cancel out rather than add up.
+    """
+    hashes = np.fromiter(
+        (zlib.crc32(word.encode()) for word in WORD.findall(text.lower())),
+        dtype=np.uint32,
+    )
+    return (
+        (hashes % dimensions).astype(np.intp),
+        np.where(hashes & 0x80000000, -1.0, 1.0),
+    )
+
+
+def build_vectors(posts, dimensions=RELATED_POSTS_DIMENSIONS,
+                  batch_size=RELATED_POSTS_BATCH_SIZE):
+    """Vectorize ``(id, title, text, category_id, location_id)`` tuples."""
+    ids, categories, locations = [], [], []
+    lengths, indices, data = [], [], []
+    document_frequency = np.zeros(dimensions)
+    for batch in batched(posts, batch_size):
+        rows, columns, weights = [], [], []
+        for row, (post_id, title, text, category_id, location_id) in (
+            enumerate(batch)
+        ):
+            ids.append(post_id)
+            categories.append(category_id or NO_LABEL)
+            locations.append(location_id or NO_LABEL)
+            for part, weight in ((title, RELATED_TITLE_WEIGHT), (text, 1.0)):
+                part_columns, signs = hash_words(part, dimensions)
+                rows.append(np.full(len(part_columns), row))
+                columns.append(part_columns)
+                weights.append(signs * weight)
+        counts = np.zeros((len(batch), dimensions), dtype=np.float32)
+        np.add.at(
+            counts,
+            (np.concatenate(rows), np.concatenate(columns)),
+            np.concatenate(weights),
+        )
+        document_frequency += np.count_nonzero(counts, axis=0)
+        # Only the dense block of one batch is held at a time.
+        nonzero_rows, nonzero_columns = np.nonzero(counts)
+        values = counts[nonzero_rows, nonzero_columns]
+        lengths.append(np.bincount(nonzero_rows, minlength=len(batch)))
+        indices.append(nonzero_columns.astype(np.int32))
+        data.append(np.sign(values) * np.log1p(np.abs(values)))
+
+    if not ids:
+        return PostVectors(
+            [], [], [], np.zeros(1, dtype=np.int64),
+            np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32),
+            dimensions,
+        )
+    lengths = np.concatenate(lengths)
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate(indices)
+    data = np.concatenate(data)
+    data *= (
+        np.log((1 + len(ids)) / (1 + document_frequency)) + 1
+    ).astype(np.float32)[indices]
+    value_rows = np.repeat(np.arange(len(ids)), lengths)
+    norms = np.sqrt(np.bincount(
+        value_rows, weights=data.astype(np.float64) ** 2, minlength=len(ids)
+    ))
+    data /= np.where(norms == 0, 1, norms)[value_rows].astype(np.float32)
+    return PostVectors(
+        ids, categories, locations, indptr, indices, data, dimensions
+    )
+
+
+def shared(labels, rows, columns):
+    """Return a matrix telling which columns share a label with the rows."""
+    selected = labels[rows, None]
+    return (selected == labels[None, columns]) & (selected != NO_LABEL)
+
+
+def get_scores(vectors, rows, chunk_size=RELATED_POSTS_CHUNK_SIZE):
+    """Yield chunks of posts and the similarity of the rows to them.
+
+    Only the rows and one chunk are dense at a time, so the memory does
+    not grow with the number of posts.
+    """
+    batch = vectors.dense(rows)
+    for start in range(0, len(vectors), chunk_size):
+        columns = np.arange(start, min(start + chunk_size, len(vectors)))
+        scores = batch @ vectors.dense(columns).T
+        scores += RELATED_CATEGORY_BONUS * shared(
+            vectors.categories, rows, columns
+        )
+        scores += RELATED_LOCATION_BONUS * shared(
+            vectors.locations, rows, columns
+        )
+        scores[rows[:, None] == columns[None, :]] = -np.inf
+        yield columns, scores
+
+
+def get_top(scores, count):
+    """Return the columns of the best scores of every row, best first."""
+    count = min(count, scores.shape[1])
+    if count <= 0:
+        return np.zeros((len(scores), 0), dtype=np.intp)
+    top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def get_content_hash(title, text, category_id, location_id, is_published):
+    """Return a fingerprint of what the neighbours of a post depend on."""
+    return hashlib.md5(
+        f'{is_published}|{category_id}|{location_id}|{title}\0{text}'
+        .encode()
+    ).hexdigest()
+
+
+def get_changed_posts():
+    """Return the content hashes of posts updated since their computation.
+
+    ``updated_at`` also moves on changes the neighbours don't depend on,
+    such as new image variants, so only the posts whose hash differs are
+    returned as stale.
+    """
+    candidates = (
+        Post.objects
+        .filter(
+            Q(related_posts_computation=None, is_published=True)
+            | Q(related_posts_computation__computed_at__lt=F('updated_at'))
+        )
+        .values_list(
+            'id', 'title', 'text', 'category_id', 'location_id',
+            'is_published', 'related_posts_computation__content_hash',
+        )
+    )
+    hashes, stale = {}, []
+    for post_id, *content, stored_hash in candidates.iterator():
+        hashes[post_id] = get_content_hash(*content)
+        if hashes[post_id] != stored_hash:
+            stale.append(post_id)
+    return hashes, stale
+
+
+def hash_posts(posts, hashes):
+    """Pass published posts through, collecting their content hashes."""
+    for post in posts:
+        hashes[post[0]] = get_content_hash(*post[1:], True)
+        yield post
+
+
+class StoredLists:
+    """Sizes of the stored neighbour lists and the scores to beat them.
+
+    Read once per run and kept up to date in memory as links are added.
+    Posts with a full list keep only neighbours better than their worst
+    one, the others take any similar post. The thresholds may stay below
+    the real worst scores, which only lets through links that ``trim``
+    drops afterwards.
+    """
+
+    def __init__(self, vectors):
+        self.counts = np.zeros(len(vectors), dtype=np.int64)
+        self.worst = np.full(len(vectors), np.inf)
+        lists = (
+            RelatedPost.objects
+            .order_by()
+            .values('post')
+            .annotate(count=Count('id'), worst=Min('score'))
+            .values_list('post', 'count', 'worst')
+        )
+        for post_id, count, worst in lists.iterator():
+            row = vectors.rows.get(post_id)
+            if row is not None:
+                self.counts[row] = count
+                self.worst[row] = worst
+        self.thresholds = np.where(
+            self.counts >= RELATED_POSTS_STORED, self.worst, 0.0
+        )
+
+    def add(self, rows, scores):
+        """Count new neighbours with the scores in the lists of the rows."""
+        np.add.at(self.counts, rows, 1)
+        np.minimum.at(self.worst, rows, scores)
+        full = rows[self.counts[rows] >= RELATED_POSTS_STORED]
+        self.thresholds[full] = np.maximum(
+            self.thresholds[full], self.worst[full]
+        )
+
+
+def trim(post_ids):
+    """Keep only the best stored neighbours of the posts."""
+    for post_id in post_ids:
+        best = list(
+            RelatedPost.objects.filter(post=post_id)
+            .values_list('id', flat=True)[:RELATED_POSTS_STORED]
+        )
+        RelatedPost.objects.filter(post=post_id).exclude(id__in=best).delete()
+
+
+def mark_computed(hashes, computed_at, batch_size):
+    """Remember when and for what content the neighbours were computed."""
+    for batch in batched(hashes, batch_size):
+        with transaction.atomic():
+            RelatedPostsComputation.objects.filter(post__in=batch).delete()
+            # Posts deleted during the run are skipped.
+            RelatedPostsComputation.objects.bulk_create(
+                RelatedPostsComputation(
+                    post_id=post_id,
+                    computed_at=computed_at,
+                    content_hash=hashes[post_id],
+                )
+                for post_id in Post.objects.filter(
+                    pk__in=batch
+                ).values_list('pk', flat=True)
+            )
+
+
+def compare_batch(vectors, batch, stored, computed_at, chunk_size):
+    """Return the links of a batch of posts and the posts they enter.
+
+    Every post of the batch gets its best neighbours. With ``stored``
+    lists the posts of the batch also enter the lists they beat.
+    """
+    links, affected = [], set()
+    best_scores = np.full((len(batch), 0), -np.inf, dtype=np.float32)
+    best_columns = np.zeros((len(batch), 0), dtype=np.intp)
+    for columns, scores in get_scores(vectors, batch, chunk_size):
+        if stored is not None:
+            thresholds = stored.thresholds[columns]
+            for index, row in enumerate(batch):
+                hits = np.flatnonzero(scores[index] > thresholds)
+                stored.add(columns[hits], scores[index, hits])
+                for column, score in zip(columns[hits], scores[index, hits]):
+                    affected.add(vectors.ids[column])
+                    links.append(RelatedPost(
+                        post_id=vectors.ids[column],
+                        related_post_id=vectors.ids[row],
+                        score=float(score),
+                        computed_at=computed_at,
+                    ))
+        # The best ones so far compete with the chunk.
+        scores = np.concatenate((best_scores, scores), axis=1)
+        candidates = np.concatenate(
+            (best_columns, np.tile(columns, (len(batch), 1))), axis=1
+        )
+        top = get_top(scores, RELATED_POSTS_STORED)
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_columns = np.take_along_axis(candidates, top, axis=1)
+    links.extend(
+        RelatedPost(
+            post_id=vectors.ids[row],
+            related_post_id=vectors.ids[column],
+            score=float(score),
+            computed_at=computed_at,
+        )
+        for row, columns, scores in zip(batch, best_columns, best_scores)
+        for column, score in zip(columns, scores)
+        if score > 0
+    )
+    return links, affected
+
+
+def update_related_posts(full=False, batch_size=RELATED_POSTS_BATCH_SIZE,
+                         chunk_size=RELATED_POSTS_CHUNK_SIZE):
+    """Store the neighbours of the changed posts, or of every post.
+
+    Only published posts are compared, whether they are visible yet is
+    checked when the neighbours are shown. A changed post also drops out
+    of the lists of other posts and re-enters those where it beats the
+    worst neighbour, so the others needn't be recomputed. Return the
+    number of posts whose neighbours were computed.
+    """
+    # Taken first, so that posts edited during the run count as changed.
+    computed_at = now()
+    hashes, post_ids = ({}, None) if full else get_changed_posts()
+    published = (
+        Post.objects.filter(is_published=True).order_by('id')
+        .values_list('id', 'title', 'text', 'category_id', 'location_id')
+        .iterator(chunk_size=batch_size)
+    )
+    vectors = build_vectors(
+        hash_posts(published, hashes) if full else published,
+        batch_size=batch_size,
+    )
+    if post_ids is None:
+        RelatedPost.objects.all().delete()
+        RelatedPostsComputation.objects.all().delete()
+        rows = np.arange(len(vectors))
+    else:
+        rows = np.array(
+            [vectors.rows[post_id] for post_id in post_ids
+             if post_id in vectors.rows],
+            dtype=np.intp,
+        )
+
+    for batch in batched(post_ids or (), batch_size):
+        with transaction.atomic():
+            # Pages showing the changed posts as neighbours get new dates.
+            RelatedPost.objects.filter(post__in=(
+                RelatedPost.objects.filter(related_post__in=batch)
+                .values('post')
+            )).update(computed_at=computed_at)
+            # Removed and unpublished posts only leave the lists of others.
+            RelatedPost.objects.filter(
+                Q(post__in=batch) | Q(related_post__in=batch)
+            ).delete()
+
+    stored = None
+    if post_ids is not None:
+        stored = StoredLists(vectors)
+        # Changed posts get complete lists of their own.
+        stored.thresholds[rows] = np.inf
+    for start in range(0, len(rows), batch_size):
+        links, affected = compare_batch(
+            vectors, rows[start:start + batch_size], stored, computed_at,
+            chunk_size,
+        )
+        with transaction.atomic():
+            RelatedPost.objects.bulk_create(links, batch_size=batch_size)
+            trim(affected)
+            for posts in batched(affected, batch_size):
+                RelatedPost.objects.filter(post__in=posts).update(
+                    computed_at=computed_at
+                )
+    # Unpublished posts and the ones with unchanged content are marked
+    # too, or they would stay changed.
+    mark_computed(hashes, computed_at, batch_size)
+    return len(rows)
@@ -0,0 +1,32 @@
+"""Post image storage in an S3-compatible object store.
+
+Needs django-storages with boto3 from requirements-optional.txt.
+Uploads are streamed to the bucket in parts and pages link to the
+objects directly.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from storages.backends.s3boto3 import S3Boto3Storage
+except ImportError as error:
+    raise ImproperlyConfigured(
+        'The s3 media storage needs django-storages and boto3, install '
+        f'them from requirements-optional.txt: {error}'
+    ) from error
+
+from core.storage import (
+    IMMUTABLE_CACHE_CONTROL, ContentAddressedStorageMixin,
+    is_content_addressed_name
+)
+
+from .constants import IMAGE_VARIANTS_DIR
+
+
+class S3PostImageStorage(ContentAddressedStorageMixin, S3Boto3Storage):
+    derivatives_dir = IMAGE_VARIANTS_DIR
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if is_content_addressed_name(name):
+            params['CacheControl'] = IMMUTABLE_CACHE_CONTROL
+        return params
@@ -0,0 +1,185 @@
+"""Full-text search over posts.
+
+On SQLite posts are indexed by the FTS5 table ``blog_post_fts`` and
+ranked with BM25, elsewhere the search falls back to ``icontains``.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Substr
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_SNIPPET_TOKENS, SEARCH_TITLE_WEIGHT
+
+# Tables with a full-text index and their indexed columns. Every index is
+# an external content FTS5 table: it holds only the inverted index and
+# reads the text from the indexed table, kept in sync by triggers on
+# every write, bulk_create() and update() included.
+SEARCH_INDEXES = {
+    'blog_post': ('title', 'text'),
+    'blog_comment': ('text',),
+}
+SEARCH_TABLE = 'blog_post_fts'
+# Snippets mark matches with control characters, which are replaced by
+# tags only after the text is escaped.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+WORD = re.compile(r'\w+')
+FTS_ORDERING = ('rank', 'id')
+FALLBACK_ORDERING = ('-pub_date', '-id')
+
+
+def get_index_table(table):
+    return f'{table}_fts'
+
+
+def get_triggers_sql(table):
+    """Return the SQL of the triggers updating the index, by their names."""
+    index = get_index_table(table)
+    columns = SEARCH_INDEXES[table]
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    insert = (
+        f'INSERT INTO {index} (rowid, {names}) '
+        f'VALUES (new.id, {new_values});'
+    )
+    delete = (
+        f'INSERT INTO {index} ({index}, rowid, {names}) '
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    return {
+        f'{index}_insert': (
+            f'CREATE TRIGGER IF NOT EXISTS {index}_insert '
+            f'AFTER INSERT ON {table} BEGIN {insert} END'
+        ),
+        f'{index}_delete': (
+            f'CREATE TRIGGER IF NOT EXISTS {index}_delete '
+            f'AFTER DELETE ON {table} BEGIN {delete} END'
+        ),
+        f'{index}_update': (
+            f'CREATE TRIGGER IF NOT EXISTS {index}_update '
+            f'AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END'
+        ),
+    }
+
+
+def get_rebuild_sql(table):
+    index = get_index_table(table)
+    return f"INSERT INTO {index} ({index}) VALUES ('rebuild')"
+
+
+def has_search_index(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def ensure_search_index(using='default'):
+    """Restore the triggers dropped when SQLite rebuilds indexed tables.
+
+    Django alters SQLite tables by copying them, which loses the triggers
+    and lets the index go stale, so it's rebuilt as well.
+    """
+    if not has_search_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        for table in SEARCH_INDEXES:
+            triggers = get_triggers_sql(table)
+            if (
+                get_index_table(table) not in existing
+                or existing >= triggers.keys()
+            ):
+                continue
+            for sql in triggers.values():
+                cursor.execute(sql)
+            cursor.execute(get_rebuild_sql(table))
+
+
+def drop_search_triggers(using='default'):
+    """Stop updating the indexes until ``ensure_search_index`` runs.
+
+    Bulk loads then skip the per-row index writes and the indexes are
+    rebuilt once at the end.
+    """
+    if not has_search_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            for name in get_triggers_sql(table):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def search_index_ids(table, query, limit):
+    """Return SQL selecting the ids of the best matching rows."""
+    index = get_index_table(table)
+    return RawSQL(
+        f'SELECT rowid FROM {index} WHERE {index} MATCH %s '
+        'ORDER BY rank LIMIT %s',
+        (build_match_query(query), limit),
+    )
+
+
+def build_match_query(query):
+    """Turn user input into an FTS5 query matching all of its words.
+
+    Words are quoted, so operators and punctuation have no effect, and
+    the last one matches as a prefix of a longer word.
+    """
+    words = WORD.findall(query)
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def search_posts(queryset, query):
+    """Return posts matching the query and the ordering to page them by.
+
+    Every post gets a ``snippet`` of its text around the matches.
+    """
+    words = WORD.findall(query)
+    if not words:
+        # Nothing is ranked, so the ordering must not refer to the rank.
+        return queryset.none(), FALLBACK_ORDERING
+    if not has_search_index(queryset.db):
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition).annotate(
+            rank=Value(0, output_field=FloatField()),
+            snippet=Substr('text', 1, 300),
+        ), FALLBACK_ORDERING
+    # The index is joined with extra(), which the ORM has no other way to
+    # express, so that the ranking functions see the matched row.
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = blog_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[build_match_query(query)],
+    ).annotate(
+        rank=RawSQL(
+            f'bm25({SEARCH_TABLE}, %s, 1.0)',
+            (SEARCH_TITLE_WEIGHT,),
+            output_field=FloatField(),
+        ),
+        snippet=RawSQL(
+            f"snippet({SEARCH_TABLE}, 1, %s, %s, '…', %s)",
+            (HIGHLIGHT_START, HIGHLIGHT_END, SEARCH_SNIPPET_TOKENS),
+        ),
+    ), FTS_ORDERING
+
+
+def highlight(snippet):
+    """Escape a snippet and wrap the matched words in ``<mark>``."""
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_save
+)
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .cache import (
+    GLOBAL_TAG, forget_next_publication, invalidate_post_pages,
+    invalidate_tags
+)
+from .images import read_image_metadata, release_image, schedule_variants
+from .models import Category, Comment, CommentEdit, Location, Post
+from .search import ensure_search_index
+
+User = get_user_model()
+
+
+def invalidate_comment_pages(comment):
+    post = Post.objects.filter(
+        pk=comment.post_id
+    ).values('category_id', 'author_id').first()
+    if post is not None:
+        invalidate_post_pages([post['category_id']], [post['author_id']])
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=now(),
+        )
+        invalidate_comment_pages(instance)
+    elif not raw:
+        updated_at = now()
+        Post.objects.filter(pk=instance.post_id).update(updated_at=updated_at)
+        CommentEdit.objects.update_or_create(
+            comment=instance, defaults={'updated_at': updated_at}
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=now(),
+    )
+    invalidate_comment_pages(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    forget_next_publication()
+    invalidate_post_pages(
+        {instance.category_id, instance.get_loaded_value('category_id')},
+        {instance.author_id, instance.get_loaded_value('author_id')},
+    )
+
+
+@receiver(pre_save, sender=Post)
+def fill_image_metadata(sender, instance, raw, **kwargs):
+    if raw or instance.image.name == instance.get_loaded_value('image'):
+        return
+    instance.image_metadata = (
+        read_image_metadata(instance.image) if instance.image else {}
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw, **kwargs):
+    loaded_name = instance.get_loaded_value('image')
+    if raw or instance.image.name == loaded_name:
+        return
+    if instance.image:
+        schedule_variants(instance.image.name)
+    if loaded_name:
+        release_image(loaded_name)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs):
+    if instance.image:
+        release_image(instance.image.name)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, **kwargs):
+    forget_next_publication()
+    invalidate_tags(GLOBAL_TAG)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, **kwargs):
+    invalidate_tags(GLOBAL_TAG)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, created, update_fields, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    invalidate_tags(GLOBAL_TAG)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    if sender.name == 'blog':
+        ensure_search_index(using)
@@ -0,0 +1,228 @@
+"""Sitemaps of posts, categories and profiles written as static files.
+
+Objects are split into shards by ``pk // SITEMAP_SHARD_SIZE``, so an
+object always lands in the same file and a change rewrites only its
+shard. Every shard has a fingerprint computed by the database; the ones
+of the written files are kept in a manifest next to them.
+"""
+import hashlib
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count, Exists, F, Max, OuterRef, Subquery, Sum
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import reverse
+
+from .constants import SITEMAP_SHARD_SIZE
+from .models import Category, Post
+
+INDEX_NAME = 'sitemap.xml'
+MANIFEST_NAME = 'sitemap-manifest.json'
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapSection:
+    """Objects of one kind listed in the sitemaps."""
+
+    name = None
+
+    def get_queryset(self):
+        raise NotImplementedError(
+            'Define get_queryset() in SitemapSection subclass'
+        )
+
+    def get_location(self, obj):
+        raise NotImplementedError(
+            'Define get_location() in SitemapSection subclass'
+        )
+
+    def get_lastmod(self, obj):
+        return obj.lastmod
+
+    def get_shard_name(self, shard):
+        return f'sitemap-{self.name}-{shard}.xml'
+
+    def get_fingerprints(self):
+        """Return a fingerprint and the last change of every shard."""
+        shards = (
+            self.get_queryset()
+            .order_by()
+            .annotate(shard=F('pk') / SITEMAP_SHARD_SIZE)
+            .values('shard')
+            .annotate(
+                count=Count('pk'), pk_sum=Sum('pk'), lastmod=Max('lastmod')
+            )
+        )
+        return {
+            shard['shard']: (
+                f"{shard['count']}:{shard['pk_sum']}:"
+                f"{shard['lastmod'].isoformat()}",
+                shard['lastmod'],
+            )
+            for shard in shards
+        }
+
+    def get_entries(self, shard):
+        """Yield the location and the last change of the shard objects."""
+        objects = self.get_queryset().filter(
+            pk__gte=shard * SITEMAP_SHARD_SIZE,
+            pk__lt=(shard + 1) * SITEMAP_SHARD_SIZE,
+        ).order_by('pk')
+        for obj in objects.iterator(chunk_size=2000):
+            yield self.get_location(obj), self.get_lastmod(obj)
+
+
+class PostSitemap(SitemapSection):
+    name = 'posts'
+
+    def get_queryset(self):
+        # Scheduled posts change the page when they appear.
+        return Post.objects.filter_is_published().annotate(
+            lastmod=Greatest('pub_date', 'updated_at')
+        ).only('pk', 'pub_date', 'updated_at')
+
+    def get_location(self, post):
+        return reverse('blog:post_detail', args=(post.pk,))
+
+
+class CategorySitemap(SitemapSection):
+    name = 'categories'
+
+    def get_queryset(self):
+        # The page changes with its visible posts as well.
+        posts_lastmod = (
+            Post.objects.filter_is_published()
+            .filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(lastmod=Max(Greatest('pub_date', 'updated_at')))
+            .values('lastmod')
+        )
+        return Category.objects.filter(is_published=True).annotate(
+            lastmod=Greatest(
+                'updated_at', Coalesce(Subquery(posts_lastmod), 'updated_at')
+            )
+        ).only('pk', 'slug', 'updated_at')
+
+    def get_location(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+
+class ProfileSitemap(SitemapSection):
+    """Profiles of authors of visible posts."""
+
+    name = 'profiles'
+
+    def get_queryset(self):
+        posts = Post.objects.filter_is_published()
+        return (
+            get_user_model().objects
+            .filter(Exists(posts.filter(author=OuterRef('pk'))))
+            .annotate(lastmod=Max('posts__updated_at'))
+            .only('pk', 'username')
+        )
+
+    def get_fingerprints(self):
+        # Users have no modification time and a new name changes the
+        # address, so the names themselves make the fingerprint.
+        fingerprints = {}
+        for user in self.get_queryset().order_by('pk').iterator():
+            shard = user.pk // SITEMAP_SHARD_SIZE
+            digest, lastmod = fingerprints.get(shard, ('', user.lastmod))
+            fingerprints[shard] = (
+                hashlib.md5(
+                    f'{digest}|{user.username}|{user.lastmod}'.encode()
+                ).hexdigest(),
+                max(lastmod, user.lastmod),
+            )
+        return fingerprints
+
+    def get_location(self, user):
+        return reverse('blog:profile', args=(user.username,))
+
+
+SECTIONS = (PostSitemap(), CategorySitemap(), ProfileSitemap())
+
+
+def write_atomically(path, lines):
+    """Replace the file at once, so it's never served half written."""
+    temporary = path.with_name(path.name + '.tmp')
+    with temporary.open('w', encoding='utf-8') as file:
+        file.writelines(lines)
+    os.replace(temporary, path)
+
+
+def render_urlset(base_url, entries):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+    for location, lastmod in entries:
+        yield (
+            f'<url><loc>{escape(base_url + location)}</loc>'
+            f'<lastmod>{lastmod.isoformat()}</lastmod></url>\n'
+        )
+    yield '</urlset>\n'
+
+
+def render_index(base_url, shards):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+    for name, shard in sorted(shards.items()):
+        yield (
+            f'<sitemap><loc>{escape(f"{base_url}/{name}")}</loc>'
+            f'<lastmod>{shard["lastmod"]}</lastmod></sitemap>\n'
+        )
+    yield '</sitemapindex>\n'
+
+
+def read_manifest(root):
+    try:
+        return json.loads((root / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def update_sitemaps(root, base_url, full=False):
+    """Write the shards that changed and the index.
+
+    Return the names of the written and the deleted shards.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    base_url = base_url.rstrip('/')
+    manifest = read_manifest(root)
+    rewrite = full or manifest.get('base_url') != base_url
+    old_shards = manifest.get('shards', {})
+    shards, written = {}, []
+    for section in SECTIONS:
+        for shard, (fingerprint, lastmod) in (
+            section.get_fingerprints().items()
+        ):
+            name = section.get_shard_name(shard)
+            shards[name] = {
+                'fingerprint': fingerprint, 'lastmod': lastmod.isoformat()
+            }
+            if (
+                not rewrite
+                and old_shards.get(name) == shards[name]
+                and (root / name).exists()
+            ):
+                continue
+            write_atomically(
+                root / name,
+                render_urlset(base_url, section.get_entries(shard)),
+            )
+            written.append(name)
+    deleted = sorted(old_shards.keys() - shards.keys())
+    for name in deleted:
+        (root / name).unlink(missing_ok=True)
+
+    if rewrite or written or deleted or not (root / INDEX_NAME).exists():
+        write_atomically(root / INDEX_NAME, render_index(base_url, shards))
+        # Written last: a failed run is redone from the old manifest.
+        write_atomically(root / MANIFEST_NAME, json.dumps(
+            {'base_url': base_url, 'shards': shards}, indent=2
+        ))
+    return written, deleted
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.functional import LazyObject, empty
+from django.utils.module_loading import import_string
+
+from core.storage import (
+    ContentAddressedStorage, ContentAddressedStorageMixin,
+    ObjectStorageEmulator
+)
+
+from .constants import IMAGE_VARIANTS_DIR
+
+
+class PostImageStorage(ContentAddressedStorage):
+    derivatives_dir = IMAGE_VARIANTS_DIR
+
+
+class EmulatedPostImageStorage(
+    ContentAddressedStorageMixin, ObjectStorageEmulator
+):
+    derivatives_dir = IMAGE_VARIANTS_DIR
+
+
+class LazyPostImageStorage(LazyObject):
+    """Storage configured by the ``POST_IMAGE_STORAGE`` setting."""
+
+    def _setup(self):
+        config = settings.POST_IMAGE_STORAGE
+        self._wrapped = import_string(config['BACKEND'])(
+            **config.get('OPTIONS', {})
+        )
+
+
+post_image_storage = LazyPostImageStorage()
+
+
+def get_post_image_storage():
+    return post_image_storage
+
+
+@receiver(setting_changed)
+def reset_post_image_storage(setting, **kwargs):
+    if setting == 'POST_IMAGE_STORAGE':
+        post_image_storage._wrapped = empty
@@ -0,0 +1,14 @@
+from django import template
+
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_cache_timeout():
+    """Return the lifetime of cached post cards.
+
+    Usage: ``{% post_card_cache_timeout as cache_timeout %}``.
+    """
+    return POST_CARD_CACHE_TIMEOUT
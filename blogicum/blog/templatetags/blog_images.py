@@ -0,0 +1,33 @@
+from django import template
+
+from blog.constants import IMAGE_PICTURE_SIZES
+from blog.images import get_picture_sources, get_variant_url
+
+register = template.Library()
+
+
+@register.filter
+def variant_url(image, variant):
+    """Return the URL of a resized copy of the image.
+
+    Usage: ``{{ post.image|variant_url:'card' }}``.
+    """
+    return get_variant_url(image, variant)
+
+
+@register.inclusion_tag('includes/picture.html')
+def post_picture(post, variant, css_class='', sizes=IMAGE_PICTURE_SIZES):
+    """Render ``<picture>`` with the modern format variants of the image.
+
+    Browsers without support for them load the ``variant`` copy. The
+    stored dimensions let them reserve the space before it's loaded.
+    Usage: ``{% post_picture post 'card' 'img-fluid' %}``.
+    """
+    return {
+        'sources': get_picture_sources(post.image),
+        'src': get_variant_url(post.image, variant),
+        'width': post.image_width,
+        'height': post.image_height,
+        'sizes': sizes,
+        'css_class': css_class,
+    }
@@ -0,0 +1,14 @@
+from django import template
+
+from blog.search import highlight as highlight_snippet
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Escape a search snippet and mark the matched words.
+
+    Usage: ``{{ post.snippet|highlight }}``.
+    """
+    return highlight_snippet(snippet)
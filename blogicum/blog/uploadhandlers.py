@@ -0,0 +1,32 @@
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .constants import IMAGE_MAX_UPLOAD_SIZE, UPLOAD_MAX_REQUEST_SIZE
+
+
+class BoundedFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to a temporary file, storing at most the size limit.
+
+    Requests declaring a larger body than any valid form are rejected with
+    400 before it is read. The bytes of a file beyond the limit are read
+    and thrown away, while the file keeps its real size, so the form is
+    able to report the error alongside the other fields.
+    """
+
+    def handle_raw_input(
+        self, input_data, meta, content_length, boundary, encoding=None
+    ):
+        if content_length > UPLOAD_MAX_REQUEST_SIZE:
+            raise RequestDataTooBig(
+                'Размер запроса превышает допустимый для загрузки файла.'
+            )
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > IMAGE_MAX_UPLOAD_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
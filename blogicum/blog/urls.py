@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 
 app_name = 'blog'
@@ -11,11 +11,18 @@ urlpatterns = [
         views.PostListView.as_view(),
         name='index'
     ),
+    path('rss/', feeds.PostFeed(), name='index_rss'),
+    path('atom/', feeds.PostAtomFeed(), name='index_atom'),
     path(
         'posts/<int:post_id>/',
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -51,6 +58,16 @@ urlpatterns = [
         views.CategoryPostListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryPostFeed(),
+        name='category_rss'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.CategoryPostAtomFeed(),
+        name='category_atom'
+    ),
     path(
         'profile/edit/',
         views.UserUpdateView.as_view(),
@@ -61,4 +78,14 @@ urlpatterns = [
         views.ProfilePostsListView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<slug:username>/rss/',
+        feeds.AuthorPostFeed(),
+        name='profile_rss'
+    ),
+    path(
+        'profile/<slug:username>/atom/',
+        feeds.AuthorPostAtomFeed(),
+        name='profile_atom'
+    ),
 ]
@@ -7,10 +7,19 @@ from django.views.generic import (
     CreateView, DeleteView, ListView, UpdateView
 )
 
-from .models import Category, Post
+from .models import Category, Post, RelatedPost
 from .forms import PostForm, CommentForm
-from .mixins import AuthorVerificationMixin, CommentMixin, PostMixin
-from .constants import MAX_OBJECT_COUNT_ON_PAGE
+from .cache import (
+    GLOBAL_TAG, INDEX_TAG, category_tag, get_tags_version, profile_tag
+)
+from .mixins import (
+    AuthorVerificationMixin, CommentMixin, ConditionalGetMixin,
+    PostListCacheMixin, PostMixin
+)
+from .search import search_posts
+from .constants import (
+    MAX_OBJECT_COUNT_ON_PAGE, RELATED_POSTS_COUNT, SEARCH_RESULT_LIMIT
+)
 
 
 class UserUpdateView(LoginRequiredMixin, UpdateView):
@@ -44,30 +53,69 @@ class CommentCreateView(CommentMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostDetailView(ListView):
+class PostDetailView(ConditionalGetMixin, ListView):
     template_name = 'blog/detail.html'
     paginate_by = MAX_OBJECT_COUNT_ON_PAGE
     post_data = None
+    related_posts_data = None
 
     def get_post(self):
+        if self.post_data is not None:
+            return self.post_data
+
         post = get_object_or_404(
-            Post,
+            Post.objects.select_related_fields(),
             pk=self.kwargs['post_id'],
         )
 
         if not post.is_published and post.author != self.request.user:
             raise Http404
 
+        self.post_data = post
         return post
 
+    def get_related_posts(self):
+        """Return the precomputed neighbours that are visible now."""
+        if self.related_posts_data is None:
+            self.related_posts_data = list(
+                RelatedPost.objects
+                .filter(post=self.get_post())
+                .filter_is_published()
+                .select_related('related_post')[:RELATED_POSTS_COUNT]
+            )
+        return self.related_posts_data
+
+    def get_last_modified(self):
+        post = self.get_post()
+        links = self.get_related_posts()
+        return max(
+            *(
+                related.updated_at
+                for related in (post, post.category, post.location)
+                if related is not None
+            ),
+            *(link.computed_at for link in links),
+            *(link.related_post.updated_at for link in links),
+            # Scheduled neighbours appear without a change of their own.
+            *(link.related_post.pub_date for link in links),
+        )
+
+    def get_etag_parts(self):
+        return (
+            self.get_post().author.username,
+            get_tags_version((GLOBAL_TAG,)),
+        )
+
     def get_queryset(self):
-        self.post_data = self.get_post()
-        return self.post_data.comments.select_related('author')
+        return self.get_post().comments.select_related('author')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
         context['post'] = self.get_post()
+        context['related_posts'] = [
+            link.related_post for link in self.get_related_posts()
+        ]
 
         return context
 
@@ -98,24 +146,64 @@ class PostDeleteView(PostMixin, DeleteView):
     pass
 
 
-class PostListView(ListView):
+class PostListView(PostListCacheMixin, ListView):
     template_name = 'blog/index.html'
     paginate_by = MAX_OBJECT_COUNT_ON_PAGE
 
+    def get_cache_tags(self):
+        return (GLOBAL_TAG, INDEX_TAG)
+
+    def get_freshness_queryset(self):
+        return Post.objects.filter_is_published()
+
     def get_queryset(self):
         return (
             Post.objects
             .select_related_fields()
             .filter_is_published()
-            .with_comment_count()
         )
 
 
-class ProfilePostsListView(ListView):
+class PostSearchView(ListView):
+    """Published posts matching ``?q=``, the most relevant first.
+
+    BM25 ranks move whenever posts change, so they can't serve as stable
+    cursors. Only the ``SEARCH_RESULT_LIMIT`` best matches are ranked on
+    every request and paged by number; a change between two requests
+    may shift results by a few places.
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = MAX_OBJECT_COUNT_ON_PAGE
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        posts, ordering = search_posts(
+            Post.objects.select_related_fields().filter_is_published(),
+            self.get_query(),
+        )
+        return posts.order_by(*ordering)[:SEARCH_RESULT_LIMIT]
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.get_query(), **kwargs)
+
+
+class ProfilePostsListView(PostListCacheMixin, ListView):
     template_name = 'blog/profile.html'
     paginate_by = MAX_OBJECT_COUNT_ON_PAGE
     author = None
 
+    def get_cache_tags(self):
+        return (GLOBAL_TAG, profile_tag(self.kwargs['username']))
+
+    def get_freshness_queryset(self):
+        posts = Post.objects.filter(author__username=self.kwargs['username'])
+        if self.request.user.username != self.kwargs['username']:
+            posts = posts.filter_is_published()
+        return posts
+
     def get_author(self):
         return get_object_or_404(
             get_user_model(),
@@ -127,7 +215,6 @@ class ProfilePostsListView(ListView):
         posts = (
             self.author.posts
             .select_related_fields()
-            .with_comment_count()
         )
         if not self.author == self.request.user:
             posts = posts.filter_is_published()
@@ -140,11 +227,19 @@ class ProfilePostsListView(ListView):
         return context
 
 
-class CategoryPostListView(ListView):
+class CategoryPostListView(PostListCacheMixin, ListView):
     template_name = 'blog/category.html'
     paginate_by = MAX_OBJECT_COUNT_ON_PAGE
     category = None
 
+    def get_cache_tags(self):
+        return (GLOBAL_TAG, category_tag(self.kwargs['category_slug']))
+
+    def get_freshness_queryset(self):
+        return Post.objects.filter_is_published().filter(
+            category__slug=self.kwargs['category_slug']
+        )
+
     def get_category(self):
         return get_object_or_404(
             Category,
@@ -158,7 +253,6 @@ class CategoryPostListView(ListView):
             self.category.posts
             .select_related_fields()
             .filter_is_published()
-            .with_comment_count()
         )
 
     def get_context_data(self, **kwargs):
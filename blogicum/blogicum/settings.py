@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -68,6 +69,31 @@ DATABASES = {
     }
 }
 
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    # Needs pymemcache from requirements-optional.txt.
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211'),
+    },
+    # Needs django-redis from requirements-optional.txt; works with any
+    # Redis-compatible server.
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -112,3 +138,64 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+POST_IMAGE_STORAGES = {
+    'filesystem': {
+        'BACKEND': 'blog.storage.PostImageStorage',
+    },
+    # Keeps files in MEDIA_ROOT but behaves like a bucket: no local paths
+    # and absolute URLs. For checking code written for object stores.
+    'emulator': {
+        'BACKEND': 'blog.storage.EmulatedPostImageStorage',
+        'OPTIONS': {
+            'endpoint_url': os.getenv(
+                'MEDIA_ENDPOINT_URL', 'http://localhost:9000/'
+            ),
+            'bucket_name': os.getenv('MEDIA_BUCKET', 'blogicum-media'),
+        },
+    },
+    # Needs django-storages and boto3 from requirements-optional.txt;
+    # works with any S3-compatible server, e.g. MinIO locally.
+    # Credentials come from the AWS_* environment variables.
+    's3': {
+        'BACKEND': 'blog.s3.S3PostImageStorage',
+        'OPTIONS': {
+            'bucket_name': os.getenv('MEDIA_BUCKET', 'blogicum-media'),
+            'endpoint_url': os.getenv('MEDIA_ENDPOINT_URL'),
+            'custom_domain': os.getenv('MEDIA_CUSTOM_DOMAIN'),
+            # Unsigned URLs stay the same between renders and let cached
+            # pages and browsers reuse them; the bucket must be public.
+            'querystring_auth': False,
+        },
+    },
+}
+
+POST_IMAGE_STORAGE = POST_IMAGE_STORAGES[
+    os.getenv('MEDIA_STORAGE', 'filesystem')
+]
+
+# Written by the generate_sitemaps command. The front server should
+# serve the XML files at the site root.
+SITEMAPS_ROOT = BASE_DIR / 'sitemaps'
+SITEMAPS_BASE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
+
+# Serve MEDIA_ROOT and the sitemaps through Django when DEBUG is off
+# as well.
+MEDIA_SERVE = False
+
+# Let the front server send media files: None, 'x-sendfile' (Apache,
+# lighttpd) or 'x-accel-redirect' (nginx, with an internal location
+# at MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT).
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Stream uploads to disk and stop storing them past the size limit.
+FILE_UPLOAD_HANDLERS = ['blog.uploadhandlers.BoundedFileUploadHandler']
+
+# Serve post lists by `?after=<cursor>` links instead of numbered pages.
+POSTS_KEYSET_PAGINATION = False
+
+# Resize uploaded post images in background threads.
+IMAGE_VARIANTS_ASYNC = True
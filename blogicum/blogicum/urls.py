@@ -1,9 +1,11 @@
+import re
+
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+from django.views.generic import TemplateView
 from django.conf import settings
-from django.conf.urls.static import static
 
-from core.views import UserCreateView
+from core.views import UserCreateView, serve_media
 
 
 handler404 = 'pages.views.page_not_found'
@@ -20,12 +22,31 @@ urlpatterns = [
     ),
     path('', include('blog.urls'), name='blog'),
     path('pages/', include('pages.urls'), name='pages'),
+    path(
+        'robots.txt',
+        TemplateView.as_view(
+            template_name='robots.txt',
+            content_type='text/plain',
+            extra_context={'sitemaps_base_url': settings.SITEMAPS_BASE_URL},
+        ),
+    ),
 ]
 
 if settings.DEBUG:
     import debug_toolbar
     # Добавить к списку urlpatterns список адресов из приложения debug_toolbar:
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+
+if settings.DEBUG or settings.MEDIA_SERVE:
     urlpatterns += (
-        static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+        re_path(
+            r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            serve_media,
+            {'document_root': settings.MEDIA_ROOT},
+        ),
+        re_path(
+            r'^(?P<path>sitemap[\w-]*\.xml)$',
+            serve_media,
+            {'document_root': settings.SITEMAPS_ROOT, 'sendfile': False},
+        ),
     )
@@ -15,8 +15,12 @@ class CreatedAt(models.Model):
 
 
 class PublishedCreatedModel(CreatedAt):
-    """Absract model. Add creation time and flag is_published."""
+    """Absract model. Add creation time, update time and flag is_published."""
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
     is_published = models.BooleanField(
         default=True,
         verbose_name='Опубликовано',
@@ -1,9 +1,147 @@
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
 from django.views.generic import CreateView
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import reverse_lazy
 
+from core.storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed_name
+
+MEDIA_CACHE_CONTROL = 'public, max-age=3600'
+RANGE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+CHUNK_SIZE = 64 * 1024
+
 
 class UserCreateView(CreateView):
     template_name = 'registration/registration_form.html'
     form_class = UserCreationForm
     success_url = reverse_lazy('blog:index')
+
+
+def get_byte_range(request, size, etag, last_modified):
+    """Return the ``(start, end)`` of a single byte range requested.
+
+    ``None`` means the whole file is sent: there is no ``Range`` header,
+    it asks for several ranges or ``If-Range`` shows that the client has
+    another version of the file. An unsatisfiable range raises
+    ``ValueError``.
+    """
+    match = RANGE.match(request.headers.get('Range', ''))
+    if match is None:
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range is not None and if_range != etag and (
+        parse_http_date_safe(if_range) != last_modified
+    ):
+        return None
+    start, end = match['start'], match['end']
+    if not start:
+        if not end:
+            return None
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def get_sendfile_response(path, name):
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        )
+    else:
+        response['X-Sendfile'] = str(path)
+    # The front server fills in the type of the file it sends.
+    del response['Content-Type']
+    return response
+
+
+def get_file_response(request, path, name, etag, last_modified,
+                      sendfile=True):
+    size = path.stat().st_size
+    try:
+        byte_range = get_byte_range(request, size, etag, last_modified)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if sendfile and settings.MEDIA_SENDFILE:
+        # The front server handles ranges and the content type itself.
+        return get_sendfile_response(path, name)
+
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(
+        read_range(path, start, end),
+        status=200 if byte_range is None else 206,
+    )
+    response['Content-Length'] = end - start + 1
+    if byte_range is not None:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    content_type, encoding = mimetypes.guess_type(name)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path, document_root=None, sendfile=True):
+    """Serve an uploaded file with range and conditional request support.
+
+    With ``MEDIA_SENDFILE`` set, only the headers are produced here and
+    the front server sends the bytes, unless ``sendfile`` is off for
+    files outside MEDIA_ROOT. Files with content hash names are
+    cached by clients forever.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = Path(safe_join(document_root, name))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not full_path.is_file():
+        raise Http404
+    stat = full_path.stat()
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = get_file_response(
+            request, full_path, name, etag, last_modified, sendfile
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL
+        if is_content_addressed_name(name)
+        else MEDIA_CACHE_CONTROL
+    )
+    return response
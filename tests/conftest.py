@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,23 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def synchronous_image_variants():
+    """Keep variant jobs from outliving the test that scheduled them."""
+    from blog.images import wait_for_variants
+
+    with override_settings(IMAGE_VARIANTS_ASYNC=False):
+        yield
+    wait_for_variants()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,7 +381,19 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".avif")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+
+    # Images are stored in directories by their hash and variants next to
+    # them, so the directories emptied above go as well.
+    for root, dirs, files in os.walk(image_dir, topdown=False):
+        if (
+                root != str(image_dir)
+                and not os.listdir(root)
+                and os.path.getmtime(root) >= start_time
+        ):
+            os.rmdir(root)
@@ -0,0 +1,60 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_results(admin_client, url, query):
+    response = admin_client.get(url, data={"q": query})
+    return list(response.context["cl"].result_list)
+
+
+def get_plan(admin_client, url, query):
+    response = admin_client.get(url, data={"q": query})
+    return response.context["cl"].queryset.explain()
+
+
+def test_admin_post_search(admin_client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", title="Вечер в театре", category=published_category
+    )
+    own = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.blend("blog.Post", title="Утро", category=published_category)
+
+    assert get_results(admin_client, "/admin/blog/post/", "театр") == [post]
+    assert get_results(
+        admin_client, "/admin/blog/post/", user.username
+    ) == [own], (
+        "Убедитесь, что в админке публикации ищутся и по имени автора."
+    )
+
+
+def test_admin_comment_search(
+        admin_client, mixer, post_with_published_location
+):
+    comment = mixer.blend(
+        "blog.Comment", text="Отличная фотография",
+        post=post_with_published_location,
+    )
+    mixer.blend(
+        "blog.Comment", text="Спасибо", post=post_with_published_location
+    )
+    with CaptureQueriesContext(connection) as context:
+        results = get_results(admin_client, "/admin/blog/comment/", "фото")
+    assert results == [comment]
+    if connection.vendor == "sqlite":
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        assert "blog_comment_fts MATCH" in sql, (
+            "Убедитесь, что поиск комментариев в админке использует"
+            " полнотекстовый индекс."
+        )
+        assert "LIKE" not in sql
+        for query in ("фото", "фото " + comment.author.username):
+            plan = get_plan(admin_client, "/admin/blog/comment/", query)
+            assert not re.search(r"SCAN blog_comment\b(?!_fts)", plan), (
+                "Убедитесь, что поиск комментариев в админке не читает"
+                " таблицу комментариев целиком."
+            )
@@ -0,0 +1,38 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.management.commands.benchmark import Command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_benchmark_reports_failed_pages(
+        mixer, monkeypatch, tmp_path, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=post.author)
+    call = Command.call
+
+    def fail_on_index(self, application, url, cookie):
+        return 500 if url == "/" else call(self, application, url, cookie)
+
+    monkeypatch.setattr(Command, "call", fail_on_index)
+    output = tmp_path / "results.jsonl"
+    stderr = StringIO()
+    with pytest.raises(CommandError):
+        call_command(
+            "benchmark", requests=1, warmup=0, mode="anonymous",
+            output=str(output), stdout=StringIO(), stderr=stderr,
+        )
+    assert "blog:index anonymous" in stderr.getvalue(), (
+        "Убедитесь, что команда `benchmark` сообщает о страницах,"
+        " ответивших ошибкой."
+    )
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert results["blog:index anonymous"]["error"], (
+        "Убедитесь, что страницы с ошибками отмечаются в результатах."
+    )
+    assert not results["blog:post_detail anonymous"]["error"]
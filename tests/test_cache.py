@@ -0,0 +1,128 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import get_cache_timeout
+from blog.constants import PAGE_CACHE_TIMEOUT
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_index_content(client):
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_fragment_cache(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in get_index_content(user_client)
+
+    Post.objects.filter(pk=post.pk).update(title="Заголовок в обход кэша")
+    assert post.title in get_index_content(user_client), (
+        "Убедитесь, что карточки публикаций кэшируются."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in get_index_content(user_client), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении публикации."
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Комментарии (1)" in get_index_content(user_client), (
+        "Убедитесь, что кэш карточки сбрасывается при добавлении"
+        " комментария."
+    )
+
+    post.category.title = "Новая категория"
+    post.category.save()
+    assert "Новая категория" in get_index_content(user_client), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении категории."
+    )
+
+
+def test_post_card_cache_follows_author(
+        user_client, post_with_published_location
+):
+    author = post_with_published_location.author
+    get_index_content(user_client)
+    type(author).objects.filter(pk=author.pk).update(
+        username=f"{author.username}_new"
+    )
+    assert f"@{author.username}_new" in get_index_content(user_client), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении имени"
+        " автора публикации."
+    )
+
+
+def test_anonymous_page_cache(
+        mixer, unlogged_client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    pages = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in pages:
+        unlogged_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = unlogged_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            f"Убедитесь, что страница `{url}` для анонимных пользователей"
+            " отдаётся из кэша без запросов к базе данных."
+        )
+
+    unpublished_post = mixer.blend(
+        "blog.Post",
+        author=post.author,
+        category=post.category,
+        is_published=False,
+        title="Неопубликованный пост",
+    )
+    new_post = mixer.blend(
+        "blog.Post", author=post.author, category=post.category
+    )
+    for url in pages:
+        content = unlogged_client.get(url).content.decode("utf-8")
+        assert new_post.title in content, (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается при добавлении"
+            " публикации."
+        )
+        assert unpublished_post.title not in content
+
+    user_client.force_login(post.author)
+    response = user_client.get(f"/profile/{post.author.username}/")
+    assert unpublished_post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что автор видит свои неопубликованные публикации на"
+        " странице профиля."
+    )
+
+
+def test_cache_timeout_follows_scheduled_posts(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    assert get_cache_timeout(PAGE_CACHE_TIMEOUT) == PAGE_CACHE_TIMEOUT
+
+    scheduled_post = mixer.blend(
+        "blog.Post",
+        category=post.category,
+        pub_date=timezone.now() + timedelta(seconds=PAGE_CACHE_TIMEOUT // 2),
+    )
+    assert get_cache_timeout(PAGE_CACHE_TIMEOUT) <= (
+        PAGE_CACHE_TIMEOUT // 2
+    ), (
+        "Убедитесь, что кэш страниц истекает к моменту публикации"
+        " отложенного поста."
+    )
+
+    scheduled_post.delete()
+    assert get_cache_timeout(PAGE_CACHE_TIMEOUT) == PAGE_CACHE_TIMEOUT
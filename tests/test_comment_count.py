@@ -0,0 +1,45 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_comment_count(post):
+    return Post.objects.get(pk=post.pk).comment_count
+
+
+def test_comment_count_follows_comments(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(N_PER_FIXTURE).blend("blog.Comment", post=post)
+    assert get_comment_count(post) == N_PER_FIXTURE, (
+        "Убедитесь, что при добавлении комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    assert get_comment_count(post) == N_PER_FIXTURE + 1
+
+    comments[0].delete()
+    Comment.objects.filter(pk=comments[1].pk).delete()
+    assert get_comment_count(post) == N_PER_FIXTURE - 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(N_PER_FIXTURE).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=100)
+
+    call_command("recount_comments", batch_size=1)
+
+    assert get_comment_count(post) == N_PER_FIXTURE, (
+        "Убедитесь, что команда `recount_comments` исправляет счётчики"
+        " комментариев."
+    )
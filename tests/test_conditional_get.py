@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def assert_not_modified(client, url, response):
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), (
+        f"Убедитесь, что страница `{url}` возвращает заголовки ETag и"
+        " Last-Modified."
+    )
+    repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        f"Убедитесь, что для неизменившейся страницы `{url}` возвращается"
+        " ответ 304."
+    )
+
+
+@pytest.mark.parametrize("client_fixture", ["unlogged_client", "user_client"])
+def test_conditional_get(request, client_fixture, mixer,
+                         post_with_published_location):
+    client = request.getfixturevalue(client_fixture)
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    responses = {}
+    for url in urls:
+        client.get(url)  # receive the CSRF cookie first
+        responses[url] = client.get(url)
+        assert_not_modified(client, url, responses[url])
+
+    mixer.blend("blog.Comment", post=post)
+    for url, response in responses.items():
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeated.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после добавления комментария страница `{url}`"
+            " отдаётся заново."
+        )
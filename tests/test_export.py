@@ -0,0 +1,108 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+pytestmark = [pytest.mark.django_db]
+
+
+def export(*args):
+    stdout = StringIO()
+    call_command("export_blog", *args, stdout=stdout)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_export_loads_back(mixer, tmp_path, post_with_published_location):
+    mixer.cycle(2).blend(
+        "blog.Comment",
+        post=post_with_published_location,
+        author=post_with_published_location.author,
+    )
+    mixer.blend("auth.User")
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", output=str(path), stdout=StringIO())
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["model"] for row in rows] == [
+        "blog.category", "blog.location", "auth.user", "blog.post",
+        "blog.comment", "blog.comment",
+    ], (
+        "Убедитесь, что выгрузка содержит по одной строке на объект, и"
+        " объекты выгружаются раньше ссылающихся на них."
+    )
+    expected = {
+        model: list(model.objects.order_by("pk").values())
+        for model in (Category, Location, User, Post, Comment)
+    }
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    User.objects.filter(pk=post_with_published_location.author_id).delete()
+    call_command("loaddata", str(path), verbosity=0)
+    for model, values in expected.items():
+        assert list(model.objects.order_by("pk").values()) == values, (
+            "Убедитесь, что выгрузку можно загрузить командой loaddata."
+        )
+
+
+def test_export_filters(mixer, published_category, published_location):
+    other_category = mixer.blend("blog.Category", is_published=True)
+    post, other_post = (
+        mixer.blend(
+            "blog.Post", category=category, location=None,
+            pub_date=timezone.now(),
+        )
+        for category in (published_category, other_category)
+    )
+    mixer.blend("blog.Comment", post=other_post)
+
+    rows = export("--category", published_category.slug)
+    assert [(row["model"], row["pk"]) for row in rows] == [
+        ("blog.category", published_category.pk),
+        ("auth.user", post.author_id),
+        ("blog.post", post.pk),
+    ], "Убедитесь, что выгрузку можно ограничить категорией."
+
+    later = timezone.now() + timedelta(days=1)
+    assert export("--published-after", later.date().isoformat()) == [], (
+        "Убедитесь, что выгрузку можно ограничить датой публикации."
+    )
+
+    since = timezone.now()
+    Post.objects.filter(pk=post.pk).update(updated_at=since)
+    rows = export("--since", since.isoformat())
+    assert [(row["model"], row["pk"]) for row in rows] == [
+        ("auth.user", post.author_id), ("blog.post", post.pk),
+    ], (
+        "Убедитесь, что выгружаются только объекты, изменённые"
+        " с указанного времени."
+    )
+
+
+def test_export_since_includes_edited_comments(
+    mixer, post_with_published_location
+):
+    post = post_with_published_location
+    old, edited = mixer.cycle(2).blend(
+        "blog.Comment", post=post, author=post.author
+    )
+    since = timezone.now()
+    Comment.objects.update(created_at=since - timedelta(days=1))
+    Post.objects.update(updated_at=since - timedelta(days=1))
+    edited.text = "Исправленный текст"
+    edited.save()
+    Post.objects.update(updated_at=since - timedelta(days=1))
+
+    rows = export("--since", since.isoformat())
+    assert [(row["model"], row["pk"]) for row in rows] == [
+        ("auth.user", post.author_id), ("blog.comment", edited.pk),
+    ], (
+        "Убедитесь, что выгрузка изменений содержит отредактированные"
+        " комментарии."
+    )
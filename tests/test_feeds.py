@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now(),
+    )
+
+
+@pytest.mark.parametrize("suffix, content_type", (
+    ("rss/", "application/rss+xml"),
+    ("atom/", "application/atom+xml"),
+))
+def test_feeds_list_published_posts(
+        mixer, client, user, published_category, feed_posts, suffix,
+        content_type
+):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    for url in (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        response = client.get(url + suffix)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что лента `{url + suffix}` доступна."
+        )
+        assert response["Content-Type"].startswith(content_type)
+        content = response.content.decode("utf-8")
+        assert all(post.title in content for post in feed_posts), (
+            "Убедитесь, что в ленту попадают опубликованные публикации."
+        )
+        assert hidden.title not in content, (
+            "Убедитесь, что в ленту не попадают снятые с публикации посты."
+        )
+
+
+def test_feed_is_cached_and_invalidated(client, feed_posts):
+    response = client.get("/rss/")
+    with CaptureQueriesContext(connection) as context:
+        cached = client.get("/rss/")
+    assert cached.content == response.content
+    assert len(context.captured_queries) == 0, (
+        "Убедитесь, что повторный запрос ленты отдаётся из кэша"
+        " без запросов к базе данных."
+    )
+    not_modified = client.get(
+        "/rss/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что лента поддерживает условные запросы."
+    )
+
+    post = feed_posts[0]
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get("/rss/", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.OK
+    assert "Новый заголовок" in response.content.decode("utf-8"), (
+        "Убедитесь, что лента обновляется при изменении публикаций."
+    )
+
+
+def test_feed_of_unknown_category(client):
+    assert client.get("/category/unknown/rss/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
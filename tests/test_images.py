@@ -0,0 +1,193 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.constants import IMAGE_RESPONSIVE_WIDTHS, IMAGE_VARIANTS
+from blog.images import (
+    get_modern_formats, get_variant_name, get_variant_url,
+    get_width_variant_name, wait_for_variants
+)
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(name="photo.jpg", size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "green").save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def test_image_variants_generated(
+        settings, tmp_path, django_capture_on_commit_callbacks,
+        post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS_ASYNC = False
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = make_image()
+        post.save()
+
+    post = Post.objects.get(pk=post.pk)
+    storage = post.image.storage
+    for variant, (width, height) in IMAGE_VARIANTS.items():
+        name = get_variant_name(post.image.name, variant)
+        assert storage.exists(name), (
+            "Убедитесь, что после загрузки изображения публикации создаются"
+            " его уменьшенные копии."
+        )
+        with storage.open(name) as file, Image.open(file) as image:
+            assert image.width <= width and image.height <= height
+        assert get_variant_url(post.image, variant) == storage.url(name)
+
+
+# The background jobs write with connections of their own, which must not
+# wait for the transaction of the test.
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("queue_size", (0, 20))
+def test_image_variants_generated_in_background(
+        settings, tmp_path, monkeypatch, post_with_published_location,
+        queue_size
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS_ASYNC = True
+    monkeypatch.setattr("blog.images.IMAGE_VARIANTS_QUEUE_SIZE", queue_size)
+    post = post_with_published_location
+    post.image = make_image()
+    post.save()
+    wait_for_variants()
+    assert post.image.storage.exists(
+        get_variant_name(post.image.name, "card")
+    ), (
+        "Убедитесь, что уменьшенные копии создаются и тогда, когда очередь"
+        " фоновых задач заполнена."
+    )
+
+
+def test_variant_url_falls_back_to_original(
+        settings, tmp_path, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    post.image = make_image()
+    post.save()
+    assert get_variant_url(post.image, "card") == post.image.url, (
+        "Пока уменьшенная копия не готова, должна использоваться ссылка на"
+        " исходное изображение."
+    )
+
+
+def test_backfill_modern_format_variants(
+        settings, tmp_path, client, monkeypatch, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    post.image = make_image()
+    post.save()
+
+    call_command("generate_image_variants", workers=1)
+
+    storage = post.image.storage
+    for image_format, _ in get_modern_formats():
+        for width in IMAGE_RESPONSIVE_WIDTHS:
+            name = get_width_variant_name(post.image.name, width, image_format)
+            with storage.open(name) as file, Image.open(file) as image:
+                assert image.format == image_format
+                assert image.width == width, (
+                    "Убедитесь, что команда `generate_image_variants` создаёт"
+                    " варианты изображения нужной ширины."
+                )
+    storage_class = type(storage._wrapped)
+    monkeypatch.setattr(storage_class, "exists", lambda *args: pytest.fail(
+        "Убедитесь, что при выводе изображений не проверяется наличие"
+        " файлов в хранилище."
+    ))
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "<picture>" in content and "srcset=" in content, (
+        "Убедитесь, что на странице публикации изображение выводится"
+        " с вариантами в современных форматах."
+    )
+
+
+def test_image_metadata_stored(
+        settings, tmp_path, client, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    post.image = make_image(size=(300, 200))
+    post.save()
+    expected = {"width": 300, "height": 200, "format": "JPEG"}
+    post.refresh_from_db()
+    assert post.image_metadata.items() >= expected.items(), (
+        "Убедитесь, что при загрузке изображения сохраняются его размеры"
+        " и формат."
+    )
+    assert post.image_metadata["size"] == post.image.size
+
+    Post.objects.filter(pk=post.pk).update(image_metadata={})
+    call_command("fill_image_metadata")
+    post.refresh_from_db()
+    assert post.image_metadata.items() >= expected.items(), (
+        "Убедитесь, что команда `fill_image_metadata` заполняет сведения"
+        " об изображениях."
+    )
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert 'width="300" height="200"' in content, (
+        "Убедитесь, что у изображения публикации выводятся атрибуты"
+        " `width` и `height`."
+    )
+
+
+def test_image_commands_refresh_cached_pages(
+        settings, tmp_path, unlogged_client, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    post.image = make_image(size=(300, 200))
+    post.save()
+    Post.objects.filter(pk=post.pk).update(image_metadata={})
+    assert 'width="300"' not in unlogged_client.get("/").content.decode()
+
+    call_command("fill_image_metadata")
+    assert 'width="300" height="200"' in (
+        unlogged_client.get("/").content.decode()
+    ), (
+        "Убедитесь, что после команды `fill_image_metadata` сбрасывается"
+        " кэш страниц с публикациями."
+    )
+
+    call_command("generate_image_variants", workers=1)
+    assert "srcset=" in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что после команды `generate_image_variants` сбрасывается"
+        " кэш страниц с публикациями."
+    )
+
+
+def test_narrow_image_not_advertised_wider(
+        settings, tmp_path, client, django_capture_on_commit_callbacks,
+        post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = make_image(size=(700, 400))
+        post.save()
+    if not get_modern_formats():
+        pytest.skip("Pillow не умеет сохранять современные форматы.")
+
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert " 640w" in content and " 700w" in content
+    assert " 960w" not in content and " 1280w" not in content, (
+        "Убедитесь, что в `srcset` не попадают ширины больше ширины"
+        " исходного изображения."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not [path for path in tmp_path.rglob("*") if path.is_file()], (
+        "Убедитесь, что вместе с изображением удаляются все его варианты."
+    )
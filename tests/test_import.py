@@ -0,0 +1,100 @@
+import io
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.management.commands.import_blog import read_array
+from blog.models import Category, Comment, Location, Post
+from blog.search import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def import_blog(path, **options):
+    stdout = StringIO()
+    call_command("import_blog", str(path), stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+def test_read_array_in_small_chunks():
+    objects = [{"pk": pk, "text": "Текст, [с] {разделителями}"} for pk in
+               range(5)]
+    file = io.StringIO(json.dumps(objects, ensure_ascii=False, indent=2))
+    assert list(read_array(file, chunk_size=7)) == objects, (
+        "Убедитесь, что массив JSON разбирается по частям."
+    )
+
+
+def test_read_array_stops_on_broken_json():
+    file = io.StringIO('[{"pk": 1}, {"pk": 2, ' + '"text": "' * 100)
+    objects = read_array(file, chunk_size=16, max_object_size=64)
+    assert next(objects) == {"pk": 1}
+    with pytest.raises(CommandError):
+        next(objects)
+    assert file.tell() < 200, (
+        "Убедитесь, что повреждённый JSON не читается в память до конца"
+        " файла."
+    )
+
+
+def test_import_fixture():
+    output = import_blog(FIXTURE, batch_size=10)
+    fixture = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    expected = {
+        model: sum(obj["model"] == model._meta.label_lower for obj in fixture)
+        for model in (Category, Location, get_user_model(), Post)
+    }
+    assert {
+        model: model.objects.count() for model in expected
+    } == expected, (
+        "Убедитесь, что команда import_blog загружает все объекты блога"
+        " из фикстуры."
+    )
+    assert "admin.logentry" in output and "объектов в секунду" in output
+
+    post = next(obj for obj in fixture if obj["model"] == "blog.post")
+    loaded = Post.objects.get(pk=post["pk"])
+    assert loaded.created_at.isoformat().startswith(
+        post["fields"]["created_at"][:19]
+    ), "Убедитесь, что сохраняется время создания объектов из фикстуры."
+    posts, ordering = search_posts(Post.objects.all(), post["fields"]["title"])
+    assert loaded in posts, (
+        "Убедитесь, что загруженные публикации попадают в поисковый индекс."
+    )
+
+
+def test_import_export_roundtrip(
+        mixer, tmp_path, post_with_published_location
+):
+    mixer.cycle(3).blend("blog.Comment", post=post_with_published_location)
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", output=str(path), stdout=StringIO())
+    expected = list(Comment.objects.order_by("pk").values())
+    Post.objects.update(comment_count=0)
+    Comment.objects.all().delete()
+
+    output = import_blog(path, ignore_conflicts=True)
+    assert list(Comment.objects.order_by("pk").values()) == expected
+    assert "blog.comment: 3\n" in output and "blog.post: 1 (пропущено)" in (
+        output
+    ), (
+        "Убедитесь, что объекты, которые уже есть в базе данных, не"
+        " считаются загруженными."
+    )
+    assert Post.objects.get().comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитываются счётчики комментариев."
+    )
+
+
+def test_loaddata_fixture():
+    call_command("loaddata", str(FIXTURE), stdout=StringIO())
+    assert not Post.objects.filter(updated_at__isnull=True).exists(), (
+        "Убедитесь, что фикстура db.json загружается командой loaddata."
+    )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+
+from core.views import serve_media
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / "posts_images").mkdir()
+    (tmp_path / "posts_images" / "photo.jpg").write_bytes(CONTENT)
+    return tmp_path
+
+
+def get(media_root, path="posts_images/photo.jpg", **headers):
+    request = RequestFactory().get(f"/media/{path}", **headers)
+    return serve_media(request, path, document_root=media_root)
+
+
+def test_range_request(media_root):
+    response = get(media_root, HTTP_RANGE="bytes=10-19")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        "Убедитесь, что на запрос с заголовком `Range` возвращается часть"
+        " файла с кодом 206."
+    )
+    assert b"".join(response.streaming_content) == CONTENT[10:20]
+    assert response["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    response = get(media_root, HTTP_RANGE="bytes=-5")
+    assert b"".join(response.streaming_content) == CONTENT[-5:]
+
+    response = get(media_root, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+
+def test_conditional_request(media_root):
+    response = get(media_root)
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+
+    response = get(media_root, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что на условный запрос к неизменившемуся файлу"
+        " возвращается код 304."
+    )
+
+
+def test_sendfile(settings, media_root):
+    settings.MEDIA_SENDFILE = "x-accel-redirect"
+    response = get(media_root)
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/posts_images/photo.jpg"
+    ), "Убедитесь, что отправка файла может передаваться веб-серверу."
+    assert not response.content
+
+
+def test_path_outside_media_root(media_root):
+    with pytest.raises(Http404):
+        get(media_root, path="../secret.txt")
@@ -0,0 +1,48 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import get_variant_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(color):
+    buffer = BytesIO()
+    Image.new("RGB", (10, 10), color).save(buffer, format="PNG")
+    return ContentFile(buffer.getvalue(), name="photo.png")
+
+
+def test_collect_media_garbage(
+        settings, tmp_path, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    post = post_with_published_location
+    post.image = make_image("green")
+    post.save()
+    storage = post.image.storage
+    kept = [post.image.name, get_variant_name(post.image.name, "card")]
+    storage.save(kept[1], ContentFile(b"variant"))
+    orphan = storage.save("posts_images/old.png", make_image("red"))
+    orphan_variant = get_variant_name(orphan, "w640", ".webp")
+    orphans = [orphan, storage.save(orphan_variant, ContentFile(b""))]
+
+    call_command("collect_media_garbage", dry_run=True, min_age=0)
+    assert all(storage.exists(name) for name in orphans), (
+        "Убедитесь, что с параметром `--dry-run` файлы не удаляются."
+    )
+
+    call_command(
+        "collect_media_garbage", quarantine=tmp_path / "quarantine", min_age=0
+    )
+    assert all(storage.exists(name) for name in kept), (
+        "Убедитесь, что изображения публикаций и их копии не удаляются."
+    )
+    assert not any(storage.exists(name) for name in orphans), (
+        "Убедитесь, что команда `collect_media_garbage` удаляет изображения,"
+        " на которые не ссылаются публикации, и их копии."
+    )
+    assert (tmp_path / "quarantine" / orphan).exists()
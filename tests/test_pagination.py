@@ -0,0 +1,74 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def encode_cursor(values):
+    data = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+@override_settings(POSTS_KEYSET_PAGINATION=True)
+def test_keyset_pagination(
+        user_client, many_posts_with_published_locations
+):
+    expected_ids = [
+        post.id for post in sorted(
+            many_posts_with_published_locations,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    received_ids = []
+    url = "/"
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            "Убедитесь, что страницы ленты публикаций с постраничной"
+            " навигацией по курсору загружаются без ошибок."
+        )
+        assert not any(
+            "COUNT(*)" in query["sql"] for query in context.captured_queries
+        ), (
+            "Убедитесь, что при навигации по курсору не подсчитывается общее"
+            " количество публикаций."
+        )
+        page_obj = response.context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE
+        received_ids.extend(post.id for post in page_obj)
+        url = f"/?after={page_obj.next_cursor}" if page_obj.has_next() else ""
+    assert received_ids == expected_ids, (
+        "Убедитесь, что при навигации по курсору каждая публикация выводится"
+        " ровно один раз и публикации отсортированы по дате."
+    )
+
+    response = user_client.get(f"/?before={page_obj.previous_cursor}")
+    assert [post.id for post in response.context["page_obj"]] == (
+        expected_ids[-len(page_obj) - N_PER_PAGE:-len(page_obj)]
+    ), "Убедитесь, что ссылка на предыдущую страницу ведёт на неё."
+
+
+@override_settings(POSTS_KEYSET_PAGINATION=True)
+@pytest.mark.parametrize("cursor", (
+    "not-a-cursor",
+    encode_cursor([None, 1]),
+    encode_cursor([{}, 1]),
+    encode_cursor(["2020-01-01T00:00:00", None]),
+    encode_cursor([1.5, "x"]),
+    encode_cursor(["2020-01-01T00:00:00", "x"]),
+))
+def test_keyset_pagination_invalid_cursor(user_client, cursor):
+    response = user_client.get(f"/?after={cursor}")
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что при неверном курсоре возвращается ошибка 404."
+    )
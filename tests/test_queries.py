@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_FIXTURE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_queries_count(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(context.captured_queries)
+
+
+def test_post_detail_queries(
+        mixer, unlogged_client, post_with_published_location
+):
+    mixer.cycle(N_PER_FIXTURE).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    queries_count = get_queries_count(
+        unlogged_client, f"/posts/{post_with_published_location.id}/"
+    )
+    assert queries_count == 4, (
+        "Убедитесь, что на странице публикации публикация вместе с"
+        " категорией, местоположением и автором запрашивается из базы данных"
+        " один раз, комментарии - одним запросом вместе с авторами,"
+        " а похожие публикации - одним запросом к рассчитанным заранее."
+    )
+
+
+def count_object_queries(client, url, table):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return sum(
+        query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_edit_pages_queries(
+        user_client, post_with_published_location, action
+):
+    url = f"/posts/{post_with_published_location.id}/{action}/"
+    assert count_object_queries(user_client, url, "blog_post") == 1, (
+        "Убедитесь, что на страницах редактирования и удаления публикации"
+        " публикация запрашивается из базы данных один раз."
+    )
+
+
+@pytest.mark.parametrize("action", ["edit_comment", "delete_comment"])
+def test_comment_edit_pages_queries(
+        mixer, user, user_client, post_with_published_location, action
+):
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    url = f"/posts/{comment.post_id}/{action}/{comment.id}/"
+    assert count_object_queries(user_client, url, "blog_comment") == 1, (
+        "Убедитесь, что на страницах редактирования и удаления комментария"
+        " комментарий запрашивается из базы данных один раз."
+    )
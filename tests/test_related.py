@@ -0,0 +1,189 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import parse_http_date
+
+from blog.models import Post, RelatedPost
+from blog.related import update_related_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def blend_posts(mixer, category, texts):
+    return [
+        mixer.blend(
+            "blog.Post", title=title, text=text, category=category,
+            location=None, is_published=True, pub_date=timezone.now(),
+        )
+        for title, text in texts
+    ]
+
+
+def get_related(post):
+    return list(
+        RelatedPost.objects.filter(post=post)
+        .values_list("related_post", flat=True)
+    )
+
+
+def get_all_links():
+    return [
+        (post, related_post, round(score, 5))
+        for post, related_post, score in RelatedPost.objects.order_by(
+            "post", "-score", "related_post"
+        ).values_list("post", "related_post", "score")
+    ]
+
+
+def test_related_posts_on_detail_page(
+        mixer, client, published_category
+):
+    rome, venice, pasta, hidden = blend_posts(mixer, published_category, (
+        ("Рим весной", "Колизей, форум и римские площади"),
+        ("Венеция весной", "Каналы, гондолы и площади"),
+        ("Рецепт пасты", "Томаты, базилик и оливковое масло"),
+        ("Черновик о Риме", "Колизей, форум и римские площади"),
+    ))
+    Post.objects.filter(pk=hidden.pk).update(pub_date=timezone.now().replace(
+        year=timezone.now().year + 1
+    ))
+    assert update_related_posts() == 4
+
+    assert get_related(rome)[:2] == [hidden.pk, venice.pk], (
+        "Убедитесь, что похожие публикации упорядочены по сходству текста."
+    )
+    content = client.get(f"/posts/{rome.pk}/").content.decode("utf-8")
+    assert venice.title in content and pasta.title in content, (
+        "Убедитесь, что на странице публикации показаны похожие публикации."
+    )
+    assert hidden.title not in content, (
+        "Убедитесь, что среди похожих не показываются отложенные публикации."
+    )
+
+
+def test_related_posts_update_incrementally(mixer, published_category):
+    rome, venice, pasta = blend_posts(mixer, published_category, (
+        ("Прогулка по Риму", "Колизей, форум и римские площади"),
+        ("Венецианские каналы", "Каналы, гондолы и площади"),
+        ("Рецепт пасты", "Томаты, базилик и оливковое масло"),
+    ))
+    update_related_posts()
+    assert update_related_posts() == 0, (
+        "Убедитесь, что без изменений похожие публикации не пересчитываются."
+    )
+    Post.objects.update(updated_at=timezone.now())
+    assert update_related_posts() == 0, (
+        "Убедитесь, что похожие публикации не пересчитываются, если"
+        " заголовок, текст, категория и местоположение не менялись."
+    )
+
+    pasta.title = "Паста в Риме"
+    pasta.text = "Колизей, форум и римские площади, а потом паста"
+    pasta.save()
+    assert update_related_posts() == 1, (
+        "Убедитесь, что пересчитываются только изменённые публикации."
+    )
+    assert get_related(rome)[0] == pasta.pk, (
+        "Убедитесь, что изменённая публикация попадает в списки похожих"
+        " у других публикаций."
+    )
+
+    pasta.is_published = False
+    pasta.save()
+    update_related_posts()
+    assert pasta.pk not in get_related(rome) + get_related(venice)
+    assert get_related(pasta) == []
+
+
+def test_posts_without_neighbours_computed_once(
+        mixer, published_category
+):
+    rome, venice = blend_posts(mixer, published_category, (
+        ("Прогулка по Риму", "Колизей, форум и римские площади"),
+        ("Венецианские каналы", "Каналы, гондолы и площади"),
+    ))
+    lonely = mixer.blend(
+        "blog.Category", is_published=True
+    )
+    blend_posts(mixer, lonely, (("Рецепт пасты", "Томаты и базилик"),))
+    assert update_related_posts() == 3
+    assert update_related_posts() == 0, (
+        "Убедитесь, что публикации без похожих не пересчитываются при"
+        " каждом запуске."
+    )
+
+    rome.is_published = False
+    rome.save()
+    assert update_related_posts() == 0
+    assert update_related_posts() == 0, (
+        "Убедитесь, что снятые с публикации публикации не пересчитываются"
+        " при каждом запуске."
+    )
+
+
+def test_last_modified_follows_scheduled_neighbours(
+        mixer, client, published_category
+):
+    rome, venice = blend_posts(mixer, published_category, (
+        ("Прогулка по Риму", "Колизей, форум и римские площади"),
+        ("Рим весной", "Колизей, форум и римские площади"),
+    ))
+    update_related_posts()
+    long_ago = timezone.now() - timedelta(days=1)
+    Post.objects.update(updated_at=long_ago)
+    RelatedPost.objects.update(computed_at=long_ago)
+    type(published_category).objects.update(updated_at=long_ago)
+    # The neighbour was scheduled and has just appeared.
+    published_at = timezone.now() - timedelta(minutes=1)
+    Post.objects.filter(pk=venice.pk).update(pub_date=published_at)
+
+    response = client.get(f"/posts/{rome.pk}/")
+    assert venice.title in response.content.decode("utf-8")
+    assert parse_http_date(response["Last-Modified"]) == int(
+        published_at.timestamp()
+    ), (
+        "Убедитесь, что дата изменения страницы публикации учитывает"
+        " появление отложенных похожих публикаций."
+    )
+
+
+def test_stored_lists_read_once_per_run(mixer, published_category):
+    posts = blend_posts(mixer, published_category, (
+        ("Прогулка по Риму", "Колизей, форум и римские площади"),
+        ("Рим весной", "Колизей и площади"),
+        ("Венецианские каналы", "Каналы, гондолы и площади"),
+        ("Рецепт пасты", "Томаты, базилик и оливковое масло"),
+    ))
+    update_related_posts()
+    for post in posts:
+        post.text += " Обновлено."
+        post.save()
+    with CaptureQueriesContext(connection) as context:
+        assert update_related_posts(batch_size=1) == len(posts)
+    assert sum(
+        'MIN("blog_relatedpost"."score")' in query["sql"]
+        for query in context.captured_queries
+    ) == 1, (
+        "Убедитесь, что размеры списков похожих публикаций читаются"
+        " один раз за запуск, а не для каждой пачки."
+    )
+
+
+def test_related_posts_compared_in_chunks(mixer, published_category):
+    blend_posts(mixer, published_category, (
+        ("Прогулка по Риму", "Колизей, форум и римские площади"),
+        ("Рим весной", "Колизей и площади"),
+        ("Венецианские каналы", "Каналы, гондолы и площади"),
+        ("Рецепт пасты", "Томаты, базилик и оливковое масло"),
+        ("Паста в Риме", "Томаты, Колизей и форум"),
+    ))
+    update_related_posts(full=True)
+    expected = get_all_links()
+    update_related_posts(full=True, batch_size=2, chunk_size=2)
+    assert get_all_links() == expected, (
+        "Убедитесь, что похожие публикации не зависят от размера частей,"
+        " на которые делятся публикации при сравнении."
+    )
@@ -0,0 +1,141 @@
+import re
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import SEARCH_INDEXES, ensure_search_index, get_triggers_sql
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search(client, query, **params):
+    response = client.get("/search/", data={"q": query, **params})
+    return response, list(response.context["page_obj"])
+
+
+def test_search_finds_published_posts(
+        mixer, client, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post", title="Вечер в театре", text="Мы ходили на <b>оперу</b>.",
+        category=published_category, location=published_location,
+        is_published=True, pub_date=timezone.now(),
+    )
+    mixer.blend(
+        "blog.Post", title="Скрытый театр", text="Текст",
+        category=published_category, is_published=False,
+    )
+    response, posts = search(client, "театр")
+    assert posts == [post], (
+        "Убедитесь, что поиск находит только опубликованные публикации."
+    )
+
+    Post.objects.filter(pk=post.pk).update(title="Утро")
+    assert search(client, "театр")[1] == [], (
+        "Убедитесь, что поисковый индекс обновляется при изменении"
+        " публикаций."
+    )
+    response, posts = search(client, "опер")
+    assert posts == [post]
+    content = response.content.decode("utf-8")
+    if connection.vendor == "sqlite":
+        assert "<mark>оперу</mark>" in content, (
+            "Убедитесь, что найденные слова выделяются в результатах."
+        )
+    assert "<b>" not in content
+
+
+def test_search_pages_by_relevance(
+        mixer, client, monkeypatch, published_category
+):
+    # Words found in most posts are ranked by chance, so most don't match.
+    mixer.cycle(40).blend(
+        "blog.Post", title="Прогулка", text="Текст", is_published=True,
+        category=published_category, pub_date=timezone.now(),
+    )
+    posts = mixer.cycle(15).blend(
+        "blog.Post", title="Прогулка", text="Новости дня", is_published=True,
+        category=published_category, pub_date=timezone.now(),
+    )
+    relevant = mixer.blend(
+        "blog.Post", title="Новости", text="Новости дня",
+        is_published=True, category=published_category,
+        pub_date=timezone.now(),
+    )
+    response, first_page = search(client, "новости")
+    if connection.vendor == "sqlite":
+        assert first_page[0] == relevant, (
+            "Убедитесь, что результаты поиска упорядочены по релевантности"
+            " и совпадения в заголовке важнее совпадений в тексте."
+        )
+    assert "q=%D0%BD%D0%BE%D0%B2%D0%BE%D1%81%D1%82%D0%B8&amp;page=2" in (
+        response.content.decode("utf-8")
+    ), "Убедитесь, что ссылки на страницы поиска сохраняют запрос."
+    _, second_page = search(client, "новости", page=2)
+    assert {*first_page, *second_page} == {*posts, relevant}, (
+        "Убедитесь, что результаты поиска разбиты на страницы без пропусков"
+        " и повторов."
+    )
+
+    monkeypatch.setattr("blog.views.SEARCH_RESULT_LIMIT", 12)
+    response, second_page = search(client, "новости", page=2)
+    assert len(second_page) == 2, (
+        "Убедитесь, что поиск ранжирует не больше SEARCH_RESULT_LIMIT"
+        " публикаций."
+    )
+    assert response.context["paginator"].num_pages == 2
+
+
+def test_search_ignores_query_syntax(client):
+    response, posts = search(client, '"театр" OR NEAR(* -')
+    assert response.status_code == 200 and posts == []
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Индекс есть только в SQLite."
+)
+def test_search_index_restored(mixer, client, published_category):
+    with connection.cursor() as cursor:
+        for name in get_triggers_sql("blog_post"):
+            cursor.execute(f"DROP TRIGGER {name}")
+    post = mixer.blend(
+        "blog.Post", title="Концерт", is_published=True,
+        category=published_category, pub_date=timezone.now(),
+    )
+    ensure_search_index()
+    assert search(client, "концерт")[1] == [post], (
+        "Убедитесь, что после перестройки таблицы публикаций поисковый"
+        " индекс восстанавливается."
+    )
+
+
+@pytest.mark.parametrize("params", ({}, {"q": ""}, {"q": "!!"}))
+def test_search_without_words(client, params):
+    response = client.get("/search/", data=params)
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска открывается без запроса"
+        " и с запросом без слов."
+    )
+    assert list(response.context["page_obj"]) == []
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Индекс есть только в SQLite."
+)
+def test_search_triggers_match_migrations():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+        )
+        migrated = {
+            name: re.sub(r"\s+", " ", sql).strip()
+            for name, sql in cursor.fetchall()
+        }
+    for table in SEARCH_INDEXES:
+        for name, sql in get_triggers_sql(table).items():
+            assert migrated[name] == sql.replace(" IF NOT EXISTS", ""), (
+                "Убедитесь, что триггеры, которые восстанавливает"
+                " `ensure_search_index`, совпадают с созданными миграциями."
+            )
@@ -0,0 +1,106 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def generate_sitemaps(settings, tmp_path, *args):
+    settings.SITEMAPS_ROOT = tmp_path
+    stdout = StringIO()
+    call_command("generate_sitemaps", *args, "--verbosity", "2",
+                 "--base-url", "https://example.com/", stdout=stdout)
+    return stdout.getvalue()
+
+
+def test_sitemaps_list_visible_objects(
+        mixer, settings, tmp_path, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    hidden = mixer.blend(
+        "blog.Post", category=published_category, is_published=False,
+    )
+    generate_sitemaps(settings, tmp_path)
+
+    index = (tmp_path / "sitemap.xml").read_text()
+    for section in ("posts", "categories", "profiles"):
+        assert f"https://example.com/sitemap-{section}-0.xml" in index, (
+            "Убедитесь, что индекс карт сайта ссылается на карты публикаций,"
+            " категорий и профилей."
+        )
+    posts = (tmp_path / "sitemap-posts-0.xml").read_text()
+    assert f"<loc>https://example.com/posts/{post.pk}/</loc>" in posts
+    assert f"/posts/{hidden.pk}/" not in posts, (
+        "Убедитесь, что в карту сайта не попадают скрытые публикации."
+    )
+    assert f"/category/{published_category.slug}/" in (
+        tmp_path / "sitemap-categories-0.xml"
+    ).read_text()
+    assert f"/profile/{user.username}/" in (
+        tmp_path / "sitemap-profiles-0.xml"
+    ).read_text()
+
+
+def test_sitemaps_regenerate_changed_shards(
+        mixer, settings, tmp_path, published_category
+):
+    post, other_post = mixer.cycle(2).blend(
+        "blog.Post", category=published_category, is_published=True,
+        pub_date=timezone.now(),
+    )
+    generate_sitemaps(settings, tmp_path)
+    assert "Записано файлов: 0" in generate_sitemaps(settings, tmp_path), (
+        "Убедитесь, что без изменений карты сайта не перезаписываются."
+    )
+
+    post.is_published = False
+    post.save()
+    output = generate_sitemaps(settings, tmp_path)
+    assert "Записан: sitemap-posts-0.xml" in output
+    assert "Записан: sitemap-profiles-0.xml" in output
+    assert "sitemap-categories-0.xml" not in output, (
+        "Убедитесь, что перезаписываются только изменившиеся карты сайта."
+    )
+
+    other_post.delete()
+    output = generate_sitemaps(settings, tmp_path)
+    assert "Удалён: sitemap-posts-0.xml" in output
+    assert not (tmp_path / "sitemap-posts-0.xml").exists(), (
+        "Убедитесь, что опустевшие карты сайта удаляются."
+    )
+    assert "sitemap-posts-0.xml" not in (tmp_path / "sitemap.xml").read_text()
+
+
+def test_category_lastmod_follows_posts(
+        mixer, settings, tmp_path, published_category
+):
+    post = mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        pub_date=timezone.now(),
+    )
+    generate_sitemaps(settings, tmp_path)
+
+    post.text = "Новый текст"
+    post.save()
+    output = generate_sitemaps(settings, tmp_path)
+    assert "Записан: sitemap-categories-0.xml" in output
+    post.refresh_from_db()
+    assert f"<lastmod>{post.updated_at.isoformat()}</lastmod>" in (
+        tmp_path / "sitemap-categories-0.xml"
+    ).read_text(), (
+        "Убедитесь, что время изменения категории в карте сайта учитывает"
+        " её публикации."
+    )
+
+
+def test_robots_txt_points_to_sitemap(client, settings):
+    response = client.get("/robots.txt")
+    assert response["Content-Type"].startswith("text/plain")
+    assert f"{settings.SITEMAPS_BASE_URL}/sitemap.xml" in (
+        response.content.decode()
+    )
@@ -0,0 +1,116 @@
+import importlib
+import sys
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+from PIL import Image
+
+from core.storage import is_content_addressed_name
+from blog.models import Post
+from core.views import serve_media
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(name):
+    buffer = BytesIO()
+    Image.new("RGB", (20, 20), "red").save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+def test_same_image_stored_once(
+        settings, tmp_path, django_capture_on_commit_callbacks, mixer,
+        post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS_ASYNC = False
+    first = post_with_published_location
+    second = mixer.blend("blog.Post", category=first.category)
+    with django_capture_on_commit_callbacks(execute=True):
+        first.image = make_image("first.png")
+        first.save()
+        second.image = make_image("second.PNG")
+        second.save()
+
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в один файл."
+    )
+    assert is_content_addressed_name(first.image.name)
+    storage = first.image.storage
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(second.image.name), (
+        "Файл не должен удаляться, пока на него ссылаются другие публикации."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not storage.exists(second.image.name), (
+        "Убедитесь, что файл удаляется, когда на него не ссылается"
+        " ни одна публикация."
+    )
+
+
+def test_content_addressed_media_cached_forever(
+        settings, tmp_path, post_with_published_location
+):
+    settings.MEDIA_ROOT = tmp_path
+    post = post_with_published_location
+    post.image = make_image("photo.png")
+    post.save()
+
+    request = RequestFactory().get(post.image.url)
+    response = serve_media(request, post.image.name, document_root=tmp_path)
+    response.close()
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с именами по хэшу содержимого отдаются"
+        " с неизменяемыми заголовками кэширования."
+    )
+
+
+def test_object_storage_emulator(
+        settings, tmp_path, django_capture_on_commit_callbacks, mixer,
+        user_client, published_category
+):
+    settings.IMAGE_VARIANTS_ASYNC = False
+    settings.POST_IMAGE_STORAGE = {
+        "BACKEND": "blog.storage.EmulatedPostImageStorage",
+        "OPTIONS": {
+            "location": tmp_path,
+            "endpoint_url": "http://objects.test/",
+            "bucket_name": "media",
+        },
+    }
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post("/posts/create/", data={
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.id,
+            "image": make_image("photo.png"),
+        })
+    post = Post.objects.get()
+    assert post.image.url.startswith("http://objects.test/media/"), (
+        "Убедитесь, что хранилище изображений публикаций настраивается"
+        " параметром `POST_IMAGE_STORAGE`."
+    )
+    assert (tmp_path / post.image.name).exists()
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "http://objects.test/media/posts_images/" in content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not list(tmp_path.rglob("*.png")), (
+        "Убедитесь, что работа с изображениями не зависит от того, что"
+        " файлы лежат на локальном диске."
+    )
+
+
+def test_object_storage_needs_optional_requirements(monkeypatch):
+    monkeypatch.setitem(sys.modules, "storages", None)
+    monkeypatch.delitem(sys.modules, "blog.s3", raising=False)
+    with pytest.raises(ImproperlyConfigured, match="requirements-optional"):
+        importlib.import_module("blog.s3")
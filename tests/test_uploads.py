@@ -0,0 +1,70 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(size=(20, 20)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "blue").save(buffer, format="PNG")
+    return SimpleUploadedFile("photo.png", buffer.getvalue(), "image/png")
+
+
+def create_post(client, category):
+    return client.post("/posts/create/", data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2020-01-01 10:00",
+        "category": category.id,
+        "image": make_image(),
+    })
+
+
+def test_image_over_size_limit_rejected(
+        monkeypatch, user_client, published_category
+):
+    monkeypatch.setattr("blog.forms.IMAGE_MAX_UPLOAD_SIZE", 10)
+    monkeypatch.setattr("blog.uploadhandlers.IMAGE_MAX_UPLOAD_SIZE", 10)
+    response = create_post(user_client, published_category)
+    assert response.status_code == HTTPStatus.OK
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что форма публикации отклоняет слишком большие файлы."
+    )
+    assert not Post.objects.exists()
+
+
+def test_image_over_pixel_limit_rejected(
+        monkeypatch, user_client, published_category
+):
+    monkeypatch.setattr("blog.forms.IMAGE_MAX_PIXELS", 100)
+    response = create_post(user_client, published_category)
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что форма публикации отклоняет изображения со слишком"
+        " большим количеством пикселей."
+    )
+    assert not Post.objects.exists()
+
+
+def test_oversized_request_rejected_early(
+        monkeypatch, user_client, published_category
+):
+    monkeypatch.setattr("blog.uploadhandlers.UPLOAD_MAX_REQUEST_SIZE", 10)
+    response = create_post(user_client, published_category)
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        "Убедитесь, что запрос с телом больше допустимого отклоняется"
+        " с кодом 400 до чтения файла."
+    )
+
+
+def test_image_within_limits_accepted(
+        settings, tmp_path, user_client, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    create_post(user_client, published_category)
+    assert Post.objects.filter(image__isnull=False).exclude(image="").exists()